@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+"""
+Compares aggregate queries over the catalog using JMESPath over the list of
+records against the columnar view in `ollama_data_tools.columnar`.
+
+    python dev/bench_columnar.py [N]
+"""
+
+import sys
+from collections import defaultdict
+from timeit import timeit
+import jmespath
+from ollama_data_tools import columnar
+from synthetic_catalog import synthetic_models
+
+def bench(label, fn, number=20):
+    t = timeit(fn, number=number) / number
+    print(f"  {label:<40} {t * 1e3:10.3f} ms")
+    return t
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    models = synthetic_models(n)
+    print(f"{n} models, numpy: {columnar.np is not None}")
+
+    total = jmespath.compile('sum([*].total_weights_size)')
+    largest = jmespath.compile('reverse(sort_by(@, &total_weights_size))[:10].[name, total_weights_size]')
+    sizes = jmespath.compile('[*].[name, total_weights_size]')
+
+    def jmes_group_by():
+        out = defaultdict(float)
+        for name, size in sizes.search(models):
+            out[name.rsplit(':', 1)[0]] += size
+        return out
+
+    def jmes_blob_sharing():
+        out = defaultdict(int)
+        for h in jmespath.search('[*].weights[].hash', models):
+            out[h] += 1
+        return out
+
+    bench('build columns (one-off)', lambda: columnar.ModelColumns(models), number=5)
+    cols = columnar.ModelColumns(models)
+
+    print('sum(total_weights_size)')
+    a = bench('jmespath', lambda: total.search(models))
+    b = bench('columnar', lambda: cols.sum('total_weights_size'))
+    print(f"  speedup {a / b:.1f}x")
+
+    print('group by family')
+    a = bench('jmespath + python', jmes_group_by)
+    b = bench('columnar', lambda: cols.group_by('family'))
+    print(f"  speedup {a / b:.1f}x")
+
+    print('top 10 by total_weights_size')
+    a = bench('jmespath', lambda: largest.search(models))
+    b = bench('columnar', lambda: cols.top_k('total_weights_size', 10))
+    print(f"  speedup {a / b:.1f}x")
+
+    print('blob sharing')
+    a = bench('jmespath + python', jmes_blob_sharing)
+    b = bench('columnar', cols.blob_sharing)
+    print(f"  speedup {a / b:.1f}x")
+
+if __name__ == "__main__":
+    main()
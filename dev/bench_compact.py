@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+"""
+Compares the memory and access times of the dictionary model records against
+the compact records in `ollama_data_tools.compact_records`.
+
+    python dev/bench_compact.py [N]
+"""
+
+import gc
+import sys
+import json
+import tracemalloc
+from timeit import timeit
+import jmespath
+from ollama_data_tools import compact_records as cr
+from synthetic_catalog import synthetic_models
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+def bench(label, fn, number=10):
+    t = timeit(fn, number=number) / number
+    print(f"  {label:<40} {t * 1e3:10.3f} ms")
+    return t
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    # Round-trip through JSON, as the records are loaded from the cache
+    text = json.dumps(synthetic_models(n))
+    print(f"{n} models")
+
+    dicts, dict_size = measure(lambda: json.loads(text))
+    records, compact_size = measure(lambda: cr.from_dicts(json.loads(text)))
+    print('resident memory')
+    print(f"  {'dict records':<40} {dict_size / 2**20:10.1f} MB")
+    print(f"  {'compact records':<40} {compact_size / 2**20:10.1f} MB")
+    print(f"  ratio {dict_size / compact_size:.1f}x")
+
+    print('sum of total_weights_size')
+    bench('dict records', lambda: sum(m['total_weights_size'] for m in dicts))
+    bench('compact records', lambda: sum(m.total_weights_size for m in records))
+
+    print('name prefix lookup')
+    bench('dict records', lambda: [m for m in dicts if m['name'].startswith('mistral-1:')])
+    bench('compact records', lambda: [m for m in records if m.name.startswith('mistral-1:')])
+
+    print('JMESPath query "[*].weights[0].hash"')
+    query = jmespath.compile('[*].weights[0].hash')
+    bench('dict records', lambda: query.search(dicts))
+    bench('compact records (dict view on demand)', lambda: query.search(cr.to_dicts(records)))
+
+    print('load')
+    bench('json.loads', lambda: json.loads(text), number=3)
+    bench('json.loads + compact', lambda: cr.from_dicts(json.loads(text)), number=3)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+"""
+Compares repeated searches with and without the query-result cache in
+`ollama_data_tools.query_cache`, on a synthetic catalog.
+
+    python dev/bench_query_cache.py [N]
+"""
+
+import os
+import sys
+import tempfile
+from timeit import timeit
+from ollama_data_tools import ollama_data as od
+from synthetic_catalog import synthetic_models
+
+SEARCHES = [
+    {'query': 'max_by(@, &total_weights_size).name'},
+    {'query': '[*].{name: name, modelfile: modelfile}', 'regex': 'mixtral-1[0-9]:', 'regex_path': 'name'},
+    {'query': 'sum([*].total_weights_size)'},
+]
+
+def bench(label, fn, number=5):
+    t = timeit(fn, number=number) / number
+    print(f"  {label:<40} {t * 1e3:10.3f} ms")
+    return t
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"{n} models")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, 'cache')
+        plain = od.OllamaData(cache_path, '1 day', history=False)
+        plain.cache.save(synthetic_models(n))
+        cached = od.OllamaData(cache_path, '1 day', history=False, query_cache=True)
+
+        for s in SEARCHES:
+            print(s)
+            bench('no cache', lambda: plain.search(**s))
+            bench('first search (miss)', lambda: cached.search(**s), number=1)
+            bench('memory hit', lambda: cached.search(**s))
+            # A new object, as in a new run of a CLI, hits on disk
+            bench('disk hit', lambda: od.OllamaData(
+                cache_path, '1 day', history=False, query_cache=True).search(**s))
+        print(cached.query_cache.stats())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+"""
+Compares lookups and aggregates against the JSON cache (load + JMESPath)
+with SQL queries against the indexed SQLite cache in
+`ollama_data_tools.sqlite_cache`.
+
+    python dev/bench_sqlite.py [N]
+"""
+
+import os
+import sys
+import tempfile
+from timeit import timeit
+from collections import defaultdict
+import jmespath
+from ollama_data_tools import json_cache as cm
+from ollama_data_tools import sqlite_cache as sc
+from synthetic_catalog import synthetic_models
+
+def bench(label, fn, number=5):
+    t = timeit(fn, number=number) / number
+    print(f"  {label:<40} {t * 1e3:10.3f} ms")
+    return t
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    models = synthetic_models(n)
+    by_host = defaultdict(list)
+    for model in models:
+        by_host[model['host']].append(model)
+    print(f"{n} models on {len(by_host)} hosts")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_caches = {h: cm.JsonCache(os.path.join(tmp, f"cache.{i}"), 3600)
+                       for i, h in enumerate(by_host)}
+        sql_path = os.path.join(tmp, 'cache.sqlite')
+        sql_caches = {h: sc.SqliteCache(sql_path, 3600, host=h) for h in by_host}
+
+        def json_models():
+            return [m for c in json_caches.values() for m in c.load()]
+
+        def sql(query, *params):
+            return list(sc.query(sql_path, query, params))
+
+        print('save')
+        bench('json', lambda: [json_caches[h].save(m) for h, m in by_host.items()], number=1)
+        bench('sqlite', lambda: [sql_caches[h].save(m) for h, m in by_host.items()], number=1)
+        print(f"  {'json size':<40} {sum(os.path.getsize(c.path) for c in json_caches.values()) / 2**20:10.1f} MB")
+        print(f"  {'sqlite size':<40} {os.path.getsize(sql_path) / 2**20:10.1f} MB")
+
+        name = models[n // 2]['name']
+        print(f"lookup by name ({name})")
+        query = jmespath.compile(f"[?name=='{name}'].host")
+        bench('json load + JMESPath', lambda: query.search(json_models()))
+        bench('sqlite', lambda: sql('SELECT host FROM models WHERE name = ?', name))
+
+        blob = models[n // 2]['weights'][0]['hash']
+        print('models sharing a blob')
+        query = jmespath.compile(f"[?weights[?hash=='{blob}']].name")
+        bench('json load + JMESPath', lambda: query.search(json_models()))
+        bench('sqlite', lambda: sql('SELECT m.name FROM blobs b JOIN models m '
+                                    'ON m.id = b.model_id WHERE b.hash = ?', blob))
+
+        print('top 10 by size')
+        query = jmespath.compile('reverse(sort_by(@, &total_weights_size))[:10].name')
+        bench('json load + JMESPath', lambda: query.search(json_models()))
+        bench('sqlite', lambda: sql('SELECT name FROM models ORDER BY total_bytes DESC LIMIT 10'))
+
+        print('total size per host')
+        bench('json load + Python', lambda: {h: sum(m['total_weights_size'] for m in c.load())
+                                             for h, c in json_caches.items()})
+        bench('sqlite', lambda: sql('SELECT host, sum(total_bytes) FROM models GROUP BY host'))
+
+        print('load all')
+        bench('json', json_models, number=3)
+        bench('sqlite', lambda: [m for c in sql_caches.values() for m in c.iter_models()], number=3)
+
+if __name__ == "__main__":
+    main()
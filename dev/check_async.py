@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+"""
+Checks `AsyncOllamaData` against the stand-in `ollama` binary (see
+`stand_in_ollama_cli.py`), which takes 0.2 s per command, and a stand-in
+Ollama host (see `stand_in_ollama.py`).
+
+    PYTHONPATH=. python dev/check_async.py
+"""
+
+import os
+import asyncio
+import tempfile
+from ollama_data_tools import ollama_data as od
+from ollama_data_tools.async_ollama_data import AsyncOllamaData
+from check_harness import check, finish, install_stand_in_ollama, start_stand_in_ollama
+
+def stable(models):
+    return [{k: v for k, v in m.items() if k not in ('age', 'last_modified')} for m in models]
+
+async def ticks(stop):
+    n = 0
+    while not stop.is_set():
+        await asyncio.sleep(0.01)
+        n += 1
+    return n
+
+async def check_local(tmp):
+    data = AsyncOllamaData(os.path.join(tmp, 'cache'), history=False, max_concurrency=4)
+    stop = asyncio.Event()
+    ticker = asyncio.ensure_future(ticks(stop))
+    results = await asyncio.gather(data.get_models(), data.get_models(), data.search('[*].name'),
+                                   data.get_model('mistral'), data.refresh())
+    stop.set()
+    check(await ticker > 20, "the event loop keeps running during a refresh")
+
+    with open(os.environ['STAND_IN_OLLAMA_LOG']) as file:
+        calls = file.read().splitlines()
+    check(calls.count('list') == 1,
+          f"concurrent callers share a single refresh ({calls.count('list')} 'ollama list')")
+    check(results[3]['name'] == 'mistral:latest', "get_model picks the most specific model")
+
+    models = od.OllamaData(os.path.join(tmp, 'sync_cache'), history=False).get_models()
+    check(stable(models) == stable(results[0]), "the models are those of OllamaData")
+
+async def check_hosts(tmp, host):
+    data = AsyncOllamaData(os.path.join(tmp, 'hosts_cache'), hosts=[host], history=False)
+    await data.get_models()
+    path = data.data.host_caches[data.hosts[0]].path
+    mtime = os.stat(path).st_mtime_ns
+    await data.refresh([host])
+    check(os.stat(path).st_mtime_ns != mtime and not data.host_errors,
+          "refresh accepts host names that are not normalized")
+    try:
+        await data.refresh(['127.0.0.1:1'])
+        check(False, "refresh rejects unknown hosts")
+    except ValueError as e:
+        check('Unknown hosts' in str(e), "refresh rejects unknown hosts")
+
+def main():
+    host_process, host = start_stand_in_ollama()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            install_stand_in_ollama(tmp, ['mistral:latest', 'mistral:7b', 'llama3:8b'])
+            os.environ['STAND_IN_OLLAMA_LOG'] = os.path.join(tmp, 'calls.log')
+            os.environ['STAND_IN_OLLAMA_DELAY'] = '0.2'
+            asyncio.run(check_local(tmp))
+            asyncio.run(check_hosts(tmp, host))
+    finally:
+        host_process.terminate()
+        host_process.wait()
+
+    finish()
+
+if __name__ == "__main__":
+    main()
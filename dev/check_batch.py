@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+
+"""
+Checks how `ollama_data_query.read_batch` parses the queries of a batch,
+including one-query batches that are also valid JSON arrays.
+
+    PYTHONPATH=. python dev/check_batch.py
+"""
+
+from ollama_data_tools.ollama_data_query import read_batch
+from check_harness import check, finish
+
+def queries(text, **kwargs):
+    return [q['query'] for q in read_batch(text, **kwargs)]
+
+def main():
+    check(queries('[*].name\n\nlength(@)\n') == ['[*].name', 'length(@)'],
+          "one query per line, blank lines skipped")
+    check(queries('[]') == ['[]'], "a flatten query is a single query")
+    check(queries('["name", "digest"]') == ['["name", "digest"]'],
+          "a multiselect of quoted identifiers is a single query")
+    batch = read_batch('{"query": "[*].name", "regex": "^m"}\nlength(@)', regex='x')
+    check(batch == [{'query': '[*].name', 'regex': '^m'},
+                    {'query': 'length(@)', 'regex': 'x', 'regex_path': '@'}],
+          "JSON object lines keep their regex, plain lines use the default")
+
+    check(queries('["[*].name", {"query": "length(@)"}]', format='json') == ['[*].name', 'length(@)'],
+          "a json batch is an array of queries and objects")
+    check(queries('[]', format='json') == [], "an empty json batch has no queries")
+    try:
+        read_batch('[*].name', format='json')
+        check(False, "a json batch that is not an array is rejected")
+    except ValueError:
+        check(True, "a json batch that is not an array is rejected")
+    finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+Checks `DiskUsage` on a small catalog whose models share blobs, on one host
+and across hosts, and `ollama_data_query --reclaim` on a cached catalog.
+
+    PYTHONPATH=. python dev/check_disk_usage.py
+"""
+
+import os
+import sys
+import json
+import tempfile
+import subprocess
+from ollama_data_tools import ollama_data as od
+from ollama_data_tools.disk_usage import DiskUsage
+from check_harness import check, finish
+
+MB = 2**20
+
+def model(name, blobs, host=None):
+    record = {'name': name,
+              'weights': [{'hash': blob, 'file_size': size / MB, 'file_size_units': 'MB'}
+                          for blob, size in blobs],
+              'layers': []}
+    if host:
+        record['host'] = host
+    return record
+
+def check_local():
+    du = DiskUsage([
+        model('mistral:latest', [('base', 100 * MB), ('adapter', 10 * MB)]),
+        model('mistral:7b', [('base', 100 * MB)]),
+        model('llama3:8b', [('llama', 50 * MB)]),
+    ])
+    check(du.unique_bytes() == 160 * MB, f"a shared blob is counted once ({du.unique_bytes()})")
+    check(du.apparent_bytes() == 260 * MB, f"apparent bytes count it per model ({du.apparent_bytes()})")
+    check(du.exclusive_bytes() == {'mistral:latest': 10 * MB, 'mistral:7b': 0, 'llama3:8b': 50 * MB},
+          "exclusive bytes leave out shared blobs")
+    check(du.reclaimable_bytes(['mistral:latest']) == 10 * MB,
+          "removing one of two models sharing a blob frees only its own blobs")
+    check(du.reclaimable_bytes(['mistral:latest', 'mistral:7b']) == 110 * MB,
+          "removing both models frees the shared blob")
+    try:
+        du.reclaimable_bytes(['mistral'])
+        check(False, "an unknown model is rejected")
+    except ValueError as e:
+        check('Unknown models: mistral' in str(e), "an unknown model is rejected")
+
+def check_hosts():
+    node1, node2 = 'http://node1:11434', 'http://node2:11434'
+    du = DiskUsage([
+        model('mistral:latest', [('base', 100 * MB)], node1),
+        model('mistral:7b', [('base', 100 * MB)], node1),
+        model('mistral:latest', [('base', 100 * MB)], node2),
+    ])
+    check(du.unique_bytes() == 200 * MB, "the same blob on two hosts is two blobs")
+    check(du.reclaimable_bytes([f'mistral:latest@{node2}']) == 100 * MB,
+          "a model named <name>@<host> frees the blobs of its host only")
+    check(du.reclaimable_bytes([f'mistral:latest@{node1}']) == 0,
+          "a blob shared on its host is not freed")
+
+def check_reclaim():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, 'cache')
+        od.OllamaData(cache_path, history=False).cache.save([
+            model('mistral:latest', [('base', 100 * MB), ('adapter', 10 * MB)]),
+            model('mistral:7b', [('base', 100 * MB)]),
+        ])
+        def reclaim(names):
+            return subprocess.run([sys.executable, '-m', 'ollama_data_tools.ollama_data_query',
+                                   '--cache-path', cache_path, '--reclaim', names],
+                                  capture_output=True, text=True, stdin=subprocess.DEVNULL)
+        result = reclaim('mistral, mistral:7b')
+        output = json.loads(result.stdout) if result.returncode == 0 else {}
+        check(output == {'models': ['mistral:latest', 'mistral:7b'], 'reclaimable_bytes': 110 * MB},
+              f"--reclaim completes names with :latest ({output})")
+        result = reclaim('mistral:70b')
+        check(result.returncode == 1 and 'Traceback' not in result.stderr,
+              "--reclaim of an unknown model fails without a traceback")
+
+def main():
+    check_local()
+    check_hosts()
+    check_reclaim()
+    finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+The harness shared by the `check_*.py` scripts: `check` records and prints
+the outcome of each check, and `finish` exits with the number of failures.
+"""
+
+import os
+import sys
+import socket
+import subprocess
+from time import sleep
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+failures = []
+
+def check(condition, message):
+    print(f"{'ok' if condition else 'FAIL'}: {message}")
+    if not condition:
+        failures.append(message)
+
+def finish(suffix=''):
+    print(f"{len(failures)} failures{suffix}")
+    sys.exit(1 if failures else 0)
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def start_stand_in_ollama(*args):
+    """
+    Start a stand-in Ollama host (see `stand_in_ollama.py`) on a free port.
+
+    :return: The process and its host, e.g., `127.0.0.1:12345`.
+    """
+    port = free_port()
+    process = subprocess.Popen([sys.executable, os.path.join(HERE, 'stand_in_ollama.py'),
+                                '--port', str(port), *args])
+    for _ in range(50):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.1).close()
+            break
+        except OSError:
+            sleep(0.1)
+    return process, f"127.0.0.1:{port}"
+
+def install_stand_in_ollama(tmp, names):
+    """
+    Put an `ollama` wrapper for the stand-in `ollama` binary (see
+    `stand_in_ollama_cli.py`) on the `PATH`, with a store of the given
+    models in `tmp`.
+    """
+    bin_dir = os.path.join(tmp, 'bin')
+    os.makedirs(bin_dir)
+    with open(os.path.join(bin_dir, 'ollama'), 'w') as file:
+        file.write(f"#!/bin/sh\nexec {sys.executable} {os.path.join(HERE, 'stand_in_ollama_cli.py')} \"$@\"\n")
+    os.chmod(os.path.join(bin_dir, 'ollama'), 0o755)
+    os.environ['PATH'] = bin_dir + os.pathsep + os.environ['PATH']
+    os.environ['OLLAMA_MODELS'] = os.path.join(tmp, 'models')
+    subprocess.run(['ollama', 'seed', *names], check=True)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+"""
+Checks `CatalogHistory`: `models_at` and `changes` across a digest
+change, and concurrent snapshots of the same host on synthetic catalogs
+(see `synthetic_catalog.py`).
+
+    PYTHONPATH=. python dev/check_history.py
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+from contextlib import closing
+from ollama_data_tools import catalog_history as ch
+from synthetic_catalog import synthetic_models
+from check_harness import check, finish
+
+def alive_versions(history):
+    with closing(sqlite3.connect(history.path)) as conn:
+        return conn.execute('SELECT COUNT(*) FROM versions WHERE removed_at IS NULL').fetchone()[0]
+
+def check_models_at_and_changes(tmp):
+    history = ch.CatalogHistory(os.path.join(tmp, 'changes.history.sqlite'))
+    mistral = {'name': 'mistral:latest', 'digest': 'd1'}
+    llama = {'name': 'llama3:8b', 'digest': 'l1'}
+    history.record([mistral, llama], time=100)
+    history.record([dict(mistral, digest='d2'), llama], time=200)
+    history.record([dict(mistral, digest='d2')], time=300)
+
+    at = lambda time: [(m['name'], m['digest']) for m in history.models_at(time)]
+    check(at(50) == [], "no models before the first snapshot")
+    check(at(150) == [('mistral:latest', 'd1'), ('llama3:8b', 'l1')],
+          f"the models as of the first snapshot ({at(150)})")
+    check(at(250) == [('llama3:8b', 'l1'), ('mistral:latest', 'd2')],
+          f"the new digest replaces the old one ({at(250)})")
+    check(at(300) == [('mistral:latest', 'd2')], f"a removed model is gone ({at(300)})")
+
+    changes = [(c['event'], c['name'], c['digest'], c['previous_digest'])
+               for c in history.changes(100, 300)]
+    check(changes == [('changed', 'mistral:latest', 'd2', 'd1'),
+                      ('removed', 'llama3:8b', None, 'l1')],
+          f"a digest change is a single changed event ({changes})")
+    check([c['event'] for c in history.changes(0, 100)] == ['added', 'added'],
+          "the first snapshot adds the models")
+    check(history.changes(200, 250) == [], "no changes between snapshots")
+    history.record([dict(mistral, digest='d2')], time=400)
+    check(history.changes(300, 400) == [], "an unchanged snapshot records no changes")
+
+def check_concurrent_record(tmp):
+    history = ch.CatalogHistory(os.path.join(tmp, 'concurrent.history.sqlite'))
+    models = synthetic_models(2000)
+    count = len({(m['name'], ch.get_digest(m)) for m in models})
+    history.record([])
+    barrier = threading.Barrier(2)
+    errors = []
+    def _record():
+        barrier.wait()
+        try:
+            history.record(models)
+        except Exception as e:
+            errors.append(e)
+    threads = [threading.Thread(target=_record) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    check(not errors, f"concurrent snapshots do not fail ({errors})")
+    alive = alive_versions(history)
+    check(alive == count, f"concurrent snapshots add each version once ({alive} of {count})")
+    history.record([])
+    alive = alive_versions(history)
+    check(alive == 0, f"an empty snapshot removes every version ({alive} left)")
+
+def check_deduplicate(tmp):
+    path = os.path.join(tmp, 'duplicates.history.sqlite')
+    with closing(sqlite3.connect(path)) as conn, conn:
+        conn.executescript(ch.SCHEMA)
+        conn.execute('DROP INDEX versions_alive')
+        conn.executemany('INSERT INTO versions (host, name, digest, added_at, record) '
+                         'VALUES (?, ?, ?, ?, ?)', [(None, 'a:latest', 'd1', 1.0, b'')] * 2)
+    history = ch.CatalogHistory(path)
+    history.record([])
+    check(alive_versions(history) == 0,
+          "duplicate alive versions recorded before the unique index are cleaned up")
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        check_models_at_and_changes(tmp)
+        check_concurrent_record(tmp)
+        check_deduplicate(tmp)
+    finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+"""
+Checks `OllamaData(hosts=...)` against several stand-in Ollama hosts (see
+`stand_in_ollama.py`): a fast one, a slow but healthy one with many models,
+and one that is too slow to answer within the timeout.
+
+    PYTHONPATH=. python dev/check_hosts.py
+"""
+
+import os
+import tempfile
+from time import time
+from ollama_data_tools import ollama_data as od
+from check_harness import check, finish, start_stand_in_ollama as start
+
+def main():
+    fast, fast_host = start('--models', 'mistral:latest,phi3:mini')
+    slow, slow_host = start('--count', '10', '--delay', '0.4')
+    # Each request is within the timeout, but the whole fetch takes ~9 s
+    stalled, stalled_host = start('--count', '40', '--delay', '1.5')
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, 'cache')
+            data = od.OllamaData(cache_path, '1 hour', hosts=[fast_host, slow_host, stalled_host],
+                                 timeout=2, history=False)
+            fast_host, slow_host, stalled_host = data.hosts
+            fetches = []
+            fetch_host_models = data._fetch_host_models
+            data._fetch_host_models = lambda host: (fetches.append(host),
+                                                    fetch_host_models(host))[1]
+
+            start_time = time()
+            models = data.get_models()
+            elapsed = time() - start_time
+            check(len(models) == 12, f"12 models from the fast and slow hosts ({len(models)})")
+            check(elapsed < 3, f"the stalled host does not delay past the timeout ({elapsed:.1f} s)")
+            check(slow_host not in data.host_errors, "the slow host with 10 models does not time out")
+            check('timed out' in data.host_errors.get(stalled_host, ''), "the stalled host times out")
+
+            data.get_models()
+            data.get_model('mistral')
+            check(fetches.count(stalled_host) == 1,
+                  f"a fetch in flight is joined, not restarted ({fetches.count(stalled_host)} fetches)")
+
+            with open(data.host_caches[fast_host].path, 'w') as file:
+                file.write('[{"name": "trunc')
+            models = data.get_models()
+            check('cache could not be loaded' in data.host_errors.get(fast_host, ''),
+                  "a corrupt cache is reported in host_errors")
+            models = data.get_models()
+            check(sum(m['host'] == fast_host for m in models) == 2,
+                  "a corrupt cache is fetched again")
+
+            mtime = os.stat(data.host_caches[slow_host].path).st_mtime_ns
+            data.refresh([slow_host.replace('http://', '')])
+            check(os.stat(data.host_caches[slow_host].path).st_mtime_ns != mtime,
+                  "refresh accepts host names that are not normalized")
+            try:
+                data.refresh(['127.0.0.1:1'])
+                check(False, "refresh rejects unknown hosts")
+            except ValueError as e:
+                check('Unknown hosts' in str(e), "refresh rejects unknown hosts")
+
+            names = {os.path.basename(c.path) for c in data.host_caches.values()}
+            leftovers = [f for f in os.listdir(tmp) if f not in names]
+            check(not leftovers, f"caches are replaced atomically, without leftovers ({leftovers})")
+
+            cached = od.OllamaData(os.path.join(tmp, 'queries', 'cache'), '1 hour',
+                                   hosts=[fast_host, stalled_host], timeout=2, history=False,
+                                   query_cache=True)
+            start_time = time()
+            names = cached.search('[*].name')
+            elapsed = time() - start_time
+            check(len(names) == 2 and elapsed < 3,
+                  f"a query cache miss waits on a stalled host only once ({elapsed:.1f} s)")
+
+            sql_path = os.path.join(tmp, 'sqlite', 'cache')
+            os.makedirs(os.path.dirname(sql_path))
+            for hosts, count in (([fast_host], 2), ([stalled_host], 0)):
+                with open(f"{sql_path}.sqlite", 'w') as file:
+                    file.write('not a database' * 100)
+                stored = od.OllamaData(sql_path, '1 hour', hosts=hosts, timeout=2,
+                                       history=False, store='sqlite')
+                models = stored.get_models()
+                check(len(models) == count,
+                      f"a corrupt database does not fail get_models ({len(models)} of {count} models)")
+            check('cache could not be loaded' in stored.host_errors.get(stalled_host, ''),
+                  "a corrupt database is reported in host_errors when its host fails")
+    finally:
+        for process in (fast, slow, stalled):
+            process.terminate()
+            process.wait()
+
+    finish()
+
+if __name__ == "__main__":
+    main()
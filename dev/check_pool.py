@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+Checks `EnginePool` and `engine_pool.serve` against the stand-in engine (see
+`stand_in_engine.py`): hits, LRU eviction, and engines that cannot start.
+
+    PYTHONPATH=. python dev/check_pool.py
+"""
+
+import os
+import sys
+import json
+import threading
+from time import time, sleep
+from urllib import request, error
+from ollama_data_tools import engine_pool as ep
+from check_harness import HERE, check, finish, free_port
+
+def stand_in_args(model, port):
+    return [sys.executable, os.path.join(HERE, 'stand_in_engine.py'),
+            '--model', model['name'], '--port', str(port), '--load-time', '0.3']
+
+def missing_args(model, port):
+    return [os.path.join(HERE, 'no_such_engine'), '--port', str(port)]
+
+def model(name):
+    return {'name': name, 'total_weights_size': 1, 'total_weights_size_units': 'GB'}
+
+def use(pool, name):
+    engine = pool.acquire(model(name))
+    pool.release(engine)
+    return engine
+
+def acquire_in_thread(pool, name, timeout):
+    """
+    Acquire an engine in a thread, and return the exception it raised, or
+    'blocked' if it did not return in time.
+    """
+    result = ['blocked']
+    def _acquire():
+        try:
+            pool.release(pool.acquire(model(name)))
+            result[0] = None
+        except Exception as e:
+            result[0] = e
+    thread = threading.Thread(target=_acquire, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    return result[0]
+
+def check_pool():
+    pool = ep.EnginePool(stand_in_args, max_engines=2, ready_timeout=10)
+    try:
+        a = use(pool, 'a:latest')
+        check(use(pool, 'a:latest') is a and pool.hits == 1 and pool.misses == 1,
+              "a warm engine is reused")
+
+        b = use(pool, 'b:latest')
+        use(pool, 'a:latest')
+        c = use(pool, 'c:latest')
+        names = [e['name'] for e in pool.status()['engines']]
+        check(names == ['a:latest', 'c:latest'], f"the least recently used engine is evicted ({names})")
+        check(not b.alive() and a.alive() and c.alive(), "the evicted engine is stopped")
+
+        held = pool.acquire(model('a:latest'))
+        other = pool.acquire(model('c:latest'))
+        use(pool, 'd:latest')
+        check(len(pool.status()['engines']) == 3, "busy engines are not evicted")
+        pool.release(held)
+        pool.release(other)
+    finally:
+        pool.close()
+    check(not a.alive() and not c.alive(), "close stops the engines")
+
+def check_failures():
+    pool = ep.EnginePool(missing_args, ready_timeout=5)
+    try:
+        result = acquire_in_thread(pool, 'a:latest', 5)
+        check(isinstance(result, RuntimeError), f"an engine that cannot be executed raises RuntimeError ({result!r})")
+        result = acquire_in_thread(pool, 'a:latest', 5)
+        check(isinstance(result, RuntimeError), f"and so does a second acquire, without blocking ({result!r})")
+        check(all(e['in_use'] == 0 for e in pool.status()['engines']), "the failed engine is not left in use")
+    finally:
+        pool.close()
+
+def post(port, name):
+    req = request.Request(f"http://127.0.0.1:{port}/completion",
+                          data=json.dumps({'model': name, 'prompt': 'hello world'}).encode())
+    try:
+        with request.urlopen(req, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except error.HTTPError as e:
+        return e.code, json.loads(e.read())
+    except OSError as e:
+        return None, {'error': str(e)}
+
+def failing_resolve(name):
+    raise RuntimeError("ollama list failed")
+
+def check_serve():
+    pools = {}
+    for args_builder, resolve in ((stand_in_args, model), (missing_args, model),
+                                  (stand_in_args, failing_resolve)):
+        port = free_port()
+        pools[port] = ep.EnginePool(args_builder, ready_timeout=10)
+        threading.Thread(target=ep.serve, args=(pools[port], resolve, '127.0.0.1', port),
+                         daemon=True).start()
+    sleep(0.5)
+    good, bad, unresolved = pools
+
+    try:
+        status, body = post(good, 'a:latest')
+        check(status == 200 and body.get('content') == 'world hello', f"a request is served by its engine ({status})")
+        status, body = post(bad, 'a:latest')
+        check(status == 502 and 'error' in body, f"an engine that cannot be executed answers 502 ({status})")
+        status, body = post(unresolved, 'a:latest')
+        check(status == 502 and 'ollama list failed' in body.get('error', ''),
+              f"a model that cannot be resolved answers 502 ({status})")
+    finally:
+        for pool in pools.values():
+            pool.close()
+
+def main():
+    start_time = time()
+    check_pool()
+    check_failures()
+    check_serve()
+    finish(f" in {time() - start_time:.1f} s")
+
+if __name__ == "__main__":
+    main()
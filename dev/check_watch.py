@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+"""
+Checks `OllamaData.watch` against the stand-in `ollama` binary (see
+`stand_in_ollama_cli.py`): a model pulled, a model removed, and a model
+whose weights changed each give one event.
+
+    PYTHONPATH=. python dev/check_watch.py
+"""
+
+import os
+import queue
+import tempfile
+import threading
+import subprocess
+from time import sleep
+from ollama_data_tools import ollama_data as od
+from check_harness import check, finish, install_stand_in_ollama
+
+def start_watch(data, events):
+    def _watch():
+        for event in data.watch(query='name', interval=0.1):
+            events.put(event)
+    threading.Thread(target=_watch, daemon=True).start()
+    # Let the watch take its first snapshot before changing the store
+    sleep(2)
+
+def next_events(events, timeout=10):
+    out = [events.get(timeout=timeout)]
+    sleep(0.5)
+    while not events.empty():
+        out.append(events.get())
+    return [(e['event'], e['name'], e['model']) for e in out]
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        install_stand_in_ollama(tmp, ['mistral:latest', 'llama3:8b'])
+        data = od.OllamaData(os.path.join(tmp, 'cache'), history=False)
+        events = queue.Queue()
+        start_watch(data, events)
+
+        subprocess.run(['ollama', 'seed', 'phi3:mini'], check=True)
+        got = next_events(events)
+        check(got == [('added', 'phi3:mini', 'phi3:mini')], f"a new model is added ({got})")
+
+        subprocess.run(['ollama', 'rm', 'llama3:8b'], check=True)
+        got = next_events(events)
+        check(got == [('removed', 'llama3:8b', 'llama3:8b')], f"a removed model is removed ({got})")
+
+        subprocess.run(['ollama', 'seed', '--revision', '1', 'mistral:latest'], check=True)
+        got = next_events(events)
+        check(got == [('changed', 'mistral:latest', 'mistral:latest')],
+              f"a model with new weights is changed ({got})")
+
+        sleep(1)
+        check(events.empty(), "an unchanged store gives no events")
+    finish()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+"""
+A stand-in for the llama.cpp server, to exercise `ollama_data_adapter --serve`
+without a real engine. It takes `--model PATH --host HOST --port PORT`, waits
+`--load-time` seconds to mimic loading the weights, then answers:
+
+    GET  /health      200 once "loaded"
+    POST /completion  {"model_path", "pid", "prompt", "content"}
+
+    ollama_data_adapter --serve --engine-path dev/stand_in_engine.py \
+        --engine-args '--load-time 2'
+"""
+
+import os
+import json
+import argparse
+from time import sleep
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model', required=True)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, required=True)
+    parser.add_argument('--load-time', type=float, default=1.0)
+    args, _ = parser.parse_known_args()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, obj):
+            body = json.dumps(obj).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            self._send(200, {'status': 'ok'}) if self.path == '/health' else self._send(404, {})
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            self._send(200, {'model_path': args.model, 'pid': os.getpid(),
+                             'prompt': request.get('prompt'),
+                             'content': ' '.join(reversed(str(request.get('prompt')).split()))})
+
+        def log_message(self, format, *args):
+            pass
+
+    sleep(args.load_time)
+    ThreadingHTTPServer((args.host, args.port), Handler).serve_forever()
+
+if __name__ == "__main__":
+    main()
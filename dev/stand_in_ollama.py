@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+"""
+A stand-in for the Ollama HTTP API, to exercise `OllamaData(hosts=...)`
+without real Ollama hosts. It answers:
+
+    GET  /api/tags   the models, with a digest, size and modification time
+    POST /api/show   {"modelfile", "parameters", "template", "system"}
+
+Each response is delayed by `--delay` seconds, to mimic a slow host. The
+models are `--models`, or those listed one per line in `--models-file`,
+which is re-read on each request so that a test can add or remove models.
+
+    python dev/stand_in_ollama.py --port 18001 --models mistral:latest,phi3:mini
+    python dev/stand_in_ollama.py --port 18002 --delay 0.4 --count 10
+"""
+
+import json
+import hashlib
+import argparse
+from time import sleep
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, required=True)
+    parser.add_argument('--models', default='mistral:latest,phi3:mini',
+                        help='Comma-separated list of model names.')
+    parser.add_argument('--count', type=int,
+                        help='Serve COUNT models named model-<i>:latest instead.')
+    parser.add_argument('--models-file',
+                        help='A file with one model name per line, re-read on each request.')
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='Seconds to wait before each response.')
+    args = parser.parse_args()
+
+    def _models():
+        if args.models_file:
+            with open(args.models_file) as file:
+                return [line.strip() for line in file if line.strip()]
+        if args.count is not None:
+            return [f"model-{i}:latest" for i in range(args.count)]
+        return args.models.split(',')
+
+    def _digest(name):
+        return hashlib.sha256(f"{args.port}/{name}".encode()).hexdigest()
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, obj):
+            sleep(args.delay)
+            body = json.dumps(obj).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != '/api/tags':
+                self._send(404, {'error': 'not found'})
+                return
+            self._send(200, {'models': [
+                {'name': name, 'model': name, 'digest': _digest(name),
+                 'modified_at': '2024-05-01T10:00:00.123456789-07:00',
+                 'size': 4 * 10**9 + len(name)}
+                for name in _models()]})
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            name = request.get('name') or request.get('model')
+            if self.path != '/api/show' or name not in _models():
+                self._send(404, {'error': f"model '{name}' not found"})
+                return
+            blob = _digest(name)
+            self._send(200, {
+                'modelfile': f"# Modelfile\nFROM /root/.ollama/models/blobs/sha256-{blob}\n"
+                             f"TEMPLATE \"[INST] {{{{ .Prompt }}}} [/INST]\"\n",
+                'parameters': 'stop                           "[INST]"\nnum_ctx 4096',
+                'template': '[INST] {{ .System }} {{ .Prompt }} [/INST]',
+                'system': f"You are {name}.",
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    ThreadingHTTPServer((args.host, args.port), Handler).serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+"""
+A stand-in for the `ollama` binary, to exercise `OllamaData` and
+`AsyncOllamaData` without Ollama. It reads the models from the manifests and
+blobs of the store in `$OLLAMA_MODELS`, like `ollama` does, and implements:
+
+    list                            NAME, ID, SIZE and MODIFIED columns
+    show NAME --modelfile|--system|--template|--parameters|--license
+
+    rm NAME...                      remove the manifests of the models
+
+plus, to populate a store:
+
+    seed [--revision N] NAME...     create a manifest and a weight blob per model;
+                                    each revision has different weights
+
+Each command waits `$STAND_IN_OLLAMA_DELAY` seconds, to mimic a slow
+`ollama`, and appends its arguments to `$STAND_IN_OLLAMA_LOG` if set. To use
+it as `ollama`, put an executable wrapper named `ollama` on the `PATH`:
+
+    #!/bin/sh
+    exec python dev/stand_in_ollama_cli.py "$@"
+"""
+
+import os
+import sys
+import json
+import hashlib
+from time import time, sleep
+
+MODELS_DIR = os.path.expanduser(os.environ.get('OLLAMA_MODELS', '~/.ollama/models'))
+MANIFESTS_DIR = os.path.join(MODELS_DIR, 'manifests', 'registry.ollama.ai', 'library')
+MODEL_MEDIA_TYPE = 'application/vnd.ollama.image.model'
+
+def manifest_path(name):
+    model, _, tag = name.partition(':')
+    return os.path.join(MANIFESTS_DIR, model, tag or 'latest')
+
+def write_blob(content):
+    digest = hashlib.sha256(content).hexdigest()
+    os.makedirs(os.path.join(MODELS_DIR, 'blobs'), exist_ok=True)
+    with open(os.path.join(MODELS_DIR, 'blobs', f"sha256-{digest}"), 'wb') as file:
+        file.write(content)
+    return {'digest': f"sha256:{digest}", 'size': len(content)}
+
+def seed(names, revision=0):
+    for name in names:
+        content = f"weights of {name}\n" if not revision else f"weights of {name}, revision {revision}\n"
+        weights = dict(write_blob(content.encode() * 1000), mediaType=MODEL_MEDIA_TYPE)
+        config = write_blob(json.dumps({'model': name}).encode())
+        path = manifest_path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as file:
+            json.dump({'schemaVersion': 2, 'config': config, 'layers': [weights]}, file)
+
+def rm(names):
+    for name in names:
+        path = manifest_path(name)
+        if not os.path.exists(path):
+            sys.exit(f"Error: model '{name}' not found")
+        os.remove(path)
+
+def models():
+    out = []
+    if not os.path.isdir(MANIFESTS_DIR):
+        return out
+    for model in sorted(os.listdir(MANIFESTS_DIR)):
+        for tag in sorted(os.listdir(os.path.join(MANIFESTS_DIR, model))):
+            path = os.path.join(MANIFESTS_DIR, model, tag)
+            with open(path, 'rb') as file:
+                content = file.read()
+            out.append({'name': f"{model}:{tag}",
+                        'id': hashlib.sha256(content).hexdigest()[:12],
+                        'manifest': json.loads(content),
+                        'mtime': os.path.getmtime(path)})
+    return out
+
+def show(name, flag):
+    model = next((m for m in models() if m['name'] == name), None)
+    if model is None:
+        sys.exit(f"Error: model '{name}' not found")
+    if flag == '--modelfile':
+        lines = ["# Modelfile generated by \"ollama show\"", f"# FROM {name}"]
+        for layer in model['manifest']['layers']:
+            if layer.get('mediaType') == MODEL_MEDIA_TYPE:
+                digest = layer['digest'].replace(':', '-')
+                lines.append(f"FROM {os.path.join(MODELS_DIR, 'blobs', digest)}")
+        lines += ['TEMPLATE "[INST] {{ .System }} {{ .Prompt }} [/INST]"',
+                  'PARAMETER stop "[INST]"', 'PARAMETER num_ctx 4096']
+        print('\n'.join(lines))
+    elif flag == '--system':
+        print(f"You are {name}.")
+    elif flag == '--template':
+        print('[INST] {{ .System }} {{ .Prompt }} [/INST]')
+    elif flag == '--parameters':
+        print('stop                           "[INST]"\nnum_ctx                        4096')
+    elif flag == '--license':
+        print('MIT')
+    else:
+        sys.exit(f"Error: unknown flag {flag}")
+
+def main():
+    args = sys.argv[1:]
+    if os.environ.get('STAND_IN_OLLAMA_LOG'):
+        with open(os.environ['STAND_IN_OLLAMA_LOG'], 'a') as file:
+            file.write(' '.join(args) + '\n')
+    sleep(float(os.environ.get('STAND_IN_OLLAMA_DELAY', 0)))
+
+    if args[:2] == ['seed', '--revision'] and len(args) > 2:
+        seed(args[3:], int(args[2]))
+    elif args[:1] == ['seed']:
+        seed(args[1:])
+    elif args[:1] == ['rm']:
+        rm(args[1:])
+    elif args[:1] == ['list']:
+        print(f"{'NAME':<24}{'ID':<16}{'SIZE':<10}MODIFIED")
+        for m in models():
+            size = sum(l.get('size', 0) for l in m['manifest']['layers']) / 1e3
+            seconds = max(1, int(time() - m['mtime']))
+            print(f"{m['name']:<24}{m['id']:<16}{size:.1f} KB   {seconds} seconds ago")
+    elif args[:1] == ['show'] and len(args) == 3:
+        show(args[1], args[2])
+    else:
+        sys.exit(f"Error: unsupported command: {' '.join(args)}")
+
+if __name__ == "__main__":
+    main()
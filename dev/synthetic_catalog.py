@@ -0,0 +1,56 @@
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Any, List
+
+FAMILIES = ['mistral', 'llama3', 'phi3', 'gemma', 'qwen2', 'codellama',
+            'mixtral', 'deepseek-coder', 'starcoder2', 'nomic-embed-text']
+TAGS = ['latest', '7b', '13b', '70b', 'instruct', 'q4_0', 'q8_0', 'fp16']
+
+def synthetic_models(n: int, hosts: int = 12, seed: int = 0) -> List[Dict[str, Any]]:
+    """
+    Generates `n` model records that follow `OllamaData.get_schema`, spread
+    over `hosts` hosts, with some weight blobs shared between models.
+
+    :param n: The number of model records.
+    :param hosts: The number of hosts.
+    :param seed: The random seed.
+    :return: A list of model records.
+    """
+    rng = random.Random(seed)
+    now = datetime.now()
+    blobs = ['%064x' % rng.getrandbits(256) for _ in range(max(1, n // 3))]
+    models = []
+    for i in range(n):
+        family = rng.choice(FAMILIES)
+        name = f"{family}-{i % 97}:{rng.choice(TAGS)}"
+        modified = now - timedelta(seconds=rng.randint(0, 3 * 365 * 86400))
+        weights = []
+        for blob in rng.sample(blobs, rng.randint(1, 2)):
+            size = rng.randint(10**8, 4 * 10**10)
+            weights.append({
+                'file_name': f"sha256-{blob}",
+                'file_path': f"/usr/share/ollama/.ollama/models/blobs/sha256-{blob}",
+                'file_size': float(size),
+                'file_size_units': 'B',
+                'last_modification': modified.isoformat(),
+                'metadata_change_time': modified.isoformat(),
+                'hash': blob,
+                'dir': '/usr/share/ollama/.ollama/models/blobs',
+            })
+        age = (now - modified).days
+        models.append({
+            'name': name,
+            'host': f"http://node{i % hosts}:11434",
+            'last_modified': modified.isoformat(),
+            'age': {'days': age % 30, 'seconds': 0, 'years': age // 365,
+                    'months': (age % 365) // 30, 'weeks': (age % 30) // 7,
+                    'hours': 0, 'minutes': 0},
+            'model_params': {'stop': '"[INST]"', 'num_ctx': '4096'},
+            'system_message': 'You are a helpful assistant.\n',
+            'template': ['[INST] {{ .System }} {{ .Prompt }} [/INST]'],
+            'modelfile': f"FROM {weights[0]['file_path']}\nTEMPLATE \"\"\"[INST] {{{{ .Prompt }}}} [/INST]\"\"\"\n",
+            'total_weights_size': sum(w['file_size'] for w in weights) / 1024**3,
+            'total_weights_size_units': 'GB',
+            'weights': weights,
+        })
+    return models
@@ -0,0 +1,266 @@
+import asyncio
+import logging
+from functools import partial
+from typing import List, Dict, Any, Optional, Callable
+import jmespath
+from ollama_data_tools import ollama_data as od
+from ollama_data_tools import ollama_data_utils as odu
+from ollama_data_tools import ollama_api as oa
+from ollama_data_tools import regex_path_matcher
+
+logger = logging.getLogger(__name__)
+
+SHOW_FLAGS = ['--modelfile', '--system', '--template', '--parameters']
+
+class AsyncOllamaData:
+    """
+    An asyncio counterpart of `OllamaData`, for use from an event loop, e.g.,
+    in a web service, where the blocking calls of `OllamaData` would stall
+    the loop.
+
+    `ollama` runs as asyncio subprocesses, and the hosts are queried over
+    the HTTP API, with at most `max_concurrency` commands or requests in
+    flight. The parsing of the outputs, the stat of the weights and the
+    reading, writing and JSON parsing of the caches run in the default
+    executor of the loop. The caches, the history and the schema of the
+    models are those of `OllamaData`.
+
+    A refresh is single-flight: callers that need the models of a host while
+    a refresh of that host is in flight await that refresh instead of
+    starting their own.
+
+    Example usage:
+
+        data = AsyncOllamaData(hosts=['node1', 'node2'])
+        models = await data.get_models()
+        model = await data.get_model('mistral')
+        names = await data.search('[*].name')
+    """
+
+    def __init__(self,
+                 cache_path: str = '~/.ollama_data/cache',
+                 cache_time: str = '1 day',
+                 hosts: Optional[List[str]] = None,
+                 timeout: float = 10.0,
+                 store: str = 'json',
+                 history: bool = True,
+                 max_concurrency: int = 8):
+        """
+        Initialize the AsyncOllamaData object.
+
+        :param cache_path: The path to the cache file.
+        :param cache_time: The duration the cache is valid.
+        :param hosts: A list of `OLLAMA_HOST`-style endpoints. See `OllamaData`.
+        :param timeout: The time in seconds to wait for each host.
+        :param store: How to cache the models, one of `ollama_data.STORES`.
+        :param history: Whether to record a snapshot of the models each time
+                        they are regenerated.
+        :param max_concurrency: The maximum number of `ollama` commands or
+                                HTTP requests in flight.
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be positive.")
+
+        self.data = od.OllamaData(cache_path, cache_time, hosts=hosts, timeout=timeout,
+                                  store=store, history=history)
+        self.max_concurrency = max_concurrency
+        self._loop = None
+        self._semaphore = None
+        self._refreshes = {}
+
+    @property
+    def hosts(self) -> List[str]:
+        return self.data.hosts
+
+    @property
+    def host_errors(self) -> Dict[str, str]:
+        return self.data.host_errors
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """
+        Get the semaphore that bounds the concurrency, which belongs to the
+        running loop.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._refreshes = {}
+        return self._semaphore
+
+    async def _in_executor(self, fn: Callable, *args) -> Any:
+        """
+        Run a blocking function in the default executor of the loop.
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, partial(fn, *args))
+
+    async def _run_ollama(self, args: List[str]) -> str:
+        """
+        Execute `ollama` with arguments and return the output. See
+        `ollama_data_utils.run_ollama`.
+        """
+        async with self._get_semaphore():
+            process = await asyncio.create_subprocess_exec(
+                'ollama', *args, stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+            stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise RuntimeError(f"ollama with args [{' '.join(args)}] failed with error: {stderr.decode()}")
+        return stdout.decode()
+
+    async def _call(self, host: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Call an endpoint of the Ollama HTTP API. See `ollama_api.call`.
+        """
+        async with self._get_semaphore():
+            return await self._in_executor(oa.call, host, path, payload, self.data.timeout)
+
+    async def _get_local_models(self) -> List[Dict[str, Any]]:
+        """
+        Generate the models of the local `ollama` binary, running the
+        `ollama show` commands of all the models concurrently.
+        """
+        async def _model(parts):
+            outputs = await asyncio.gather(
+                *(self._run_ollama(['show', parts[0], flag]) for flag in SHOW_FLAGS))
+            return await self._in_executor(odu.make_model, parts, *outputs)
+
+        parts = odu.parse_model_list(await self._run_ollama(['list']))
+        return list(await asyncio.gather(*(_model(p) for p in parts)))
+
+    async def _get_remote_models(self, host: str) -> List[Dict[str, Any]]:
+        """
+        Generate the models of a host over the HTTP API, requesting the
+        `/api/show` of all the models concurrently.
+        """
+        tags = (await self._call(host, '/api/tags')).get('models', [])
+        shows = await asyncio.gather(
+            *(self._call(host, '/api/show', {'name': tag['name']}) for tag in tags))
+        return await self._in_executor(
+            lambda: [oa.make_model(tag, show) for tag, show in zip(tags, shows)])
+
+    async def _fetch(self, host: Optional[str]) -> None:
+        """
+        Generate the models of a host and save them.
+
+        :param host: The host, or None if the object was not created with `hosts`.
+        """
+        if host is None:
+            models = await self._get_local_models()
+        elif host == od.LOCAL_HOST:
+            models = await asyncio.wait_for(self._get_local_models(), self.data.timeout)
+        else:
+            models = await asyncio.wait_for(self._get_remote_models(host), self.data.timeout)
+        await self._in_executor(self.data.save_models, models, host)
+
+    async def _refresh(self, hosts: List[Optional[str]]) -> None:
+        """
+        Regenerate the models of some hosts concurrently, joining the
+        refreshes already in flight. A host that fails or times out is
+        recorded in `host_errors`, except without `hosts`, where the error
+        is raised.
+
+        :param hosts: The hosts, or `[None]` if the object was not created
+                      with `hosts`.
+        """
+        self._get_semaphore()
+        tasks = []
+        for host in hosts:
+            task = self._refreshes.get(host)
+            if task is None:
+                task = asyncio.ensure_future(self._fetch(host))
+                self._refreshes[host] = task
+                task.add_done_callback(partial(self._refresh_done, host))
+            tasks.append(task)
+
+        # A caller that is cancelled does not cancel a refresh others await
+        results = await asyncio.gather(*(asyncio.shield(t) for t in tasks),
+                                       return_exceptions=True)
+        for host, result in zip(hosts, results):
+            if not isinstance(result, BaseException):
+                self.data.host_errors.pop(host, None)
+                continue
+            if host is None:
+                raise result
+            if isinstance(result, asyncio.TimeoutError):
+                result = f"timed out after {self.data.timeout} seconds"
+            self.data.host_errors[host] = str(result)
+            logger.warning(f"Host {host} failed: {result}")
+
+    def _refresh_done(self, host: Optional[str], task: asyncio.Future) -> None:
+        if self._refreshes.get(host) is task:
+            del self._refreshes[host]
+        if not task.cancelled():
+            # The exception is reported by `_refresh`
+            task.exception()
+
+    def _cache(self, host: Optional[str]):
+        return self.data.cache if host is None else self.data.host_caches[host]
+
+    def _stale_hosts(self) -> List[Optional[str]]:
+        return [h for h in self.hosts or [None] if not self._cache(h).is_valid()]
+
+    async def get_models(self) -> List[Dict[str, Any]]:
+        """
+        Get the models, regenerating those of the hosts whose cache has
+        expired. See `OllamaData.get_models`.
+
+        :return: A list of dictionaries representing the models.
+        """
+        stale = await self._in_executor(self._stale_hosts)
+        if stale:
+            await self._refresh(stale)
+        return await self._in_executor(self.data._load_cached_models)
+
+    async def refresh(self, hosts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Regenerate the models now, even if the cache has not expired. If a
+        refresh of a host is already in flight, it is awaited instead.
+
+        :param hosts: The hosts to refetch, or None for all of them. Only
+                      used if the object was created with `hosts`.
+        :return: A list of dictionaries representing the models.
+        :raises ValueError: If a host is not one of the hosts of the object.
+        """
+        if self.hosts:
+            hosts = self.data.resolve_hosts(hosts) if hosts else self.hosts
+        else:
+            hosts = [None]
+        await self._refresh(hosts)
+        return await self._in_executor(self.data._load_cached_models)
+
+    async def get_model(self, name: str, host: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the model by name. See `OllamaData.get_model`.
+
+        :param name: The name of the model.
+        :param host: Only consider the models of this host.
+        :return: A dictionary representing the model.
+        """
+        if host is not None and host != od.LOCAL_HOST:
+            host = oa.normalize_host(host)
+        models = await self.get_models()
+        return od.select_model([m for m in models if m['name'].startswith(name)
+                                and (host is None or m.get('host') == host)], name)
+
+    async def search(self,
+                     query: str = '[*]',
+                     regex: Optional[str] = None,
+                     regex_path: str = '@') -> Any:
+        """
+        Query/search/view the models using a JMESPath query and regex filter.
+        The query runs in the executor. See `OllamaData.search`.
+
+        :param query: The JMESPath query to filter and provide a view of the models.
+        :param regex: The regex pattern to match against the output.
+        :param regex_path: The JMESPath query for the regex pattern.
+        :return: JSON (dict) object representing some view of the models.
+        """
+        models = await self.get_models()
+
+        def _search():
+            output = jmespath.search(query, models)
+            if regex:
+                output = regex_path_matcher.regex_path_matcher(output, regex, regex_path)
+            return output
+        return await self._in_executor(_search)
@@ -0,0 +1,259 @@
+import os
+import json
+import zlib
+import sqlite3
+import hashlib
+from time import time as now
+from datetime import datetime
+from contextlib import closing
+from typing import Dict, Any, List, Iterable, Optional, Union
+from dateutil.parser import isoparse
+from ollama_data_tools import conversion_tools as ct
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS versions (
+    id INTEGER PRIMARY KEY,
+    host TEXT,
+    name TEXT NOT NULL,
+    digest TEXT NOT NULL,
+    added_at REAL NOT NULL,
+    removed_at REAL,
+    record BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    host TEXT,
+    time REAL NOT NULL,
+    models INTEGER NOT NULL,
+    added INTEGER NOT NULL,
+    removed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS versions_current ON versions(host) WHERE removed_at IS NULL;
+CREATE INDEX IF NOT EXISTS versions_added_at ON versions(added_at);
+CREATE INDEX IF NOT EXISTS versions_removed_at ON versions(removed_at);
+CREATE INDEX IF NOT EXISTS snapshots_time ON snapshots(time);
+-- At most one alive version of a model; NULL hosts would be distinct keys
+CREATE UNIQUE INDEX IF NOT EXISTS versions_alive
+    ON versions(IFNULL(host, ''), name, digest) WHERE removed_at IS NULL;
+"""
+
+# Databases recorded before `versions_alive` may hold duplicate alive
+# versions, left by concurrent `record` calls; only the first one is kept
+DEDUPLICATE = """
+DELETE FROM versions WHERE removed_at IS NULL AND id NOT IN (
+    SELECT MIN(id) FROM versions WHERE removed_at IS NULL
+    GROUP BY IFNULL(host, ''), name, digest);
+"""
+
+ANY_HOST = object()
+
+def parse_time(value: Union[str, float, datetime]) -> float:
+    """
+    Parses a point in time: a POSIX timestamp, a `datetime`, an ISO date,
+    e.g., "2024-05-01T10:00", or a duration ago, e.g., "3 days".
+
+    :param value: The point in time.
+    :return: The POSIX timestamp.
+    :raises ValueError: If the input format is invalid.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return isoparse(value).timestamp()
+    except ValueError:
+        _, delta = ct.parse_duration(value)
+        return now() - delta.total_seconds()
+
+def get_digest(model: Dict[str, Any]) -> str:
+    """
+    Get the digest that identifies the version of a model. It is the
+    `digest` of the model or, for records without one, a hash of the record
+    without the fields that change on every refresh (`age`, `last_modified`).
+
+    :param model: The model. See `OllamaData.get_schema`.
+    :return: The digest.
+    """
+    if model.get('digest'):
+        return model['digest']
+    stable = {k: v for k, v in model.items() if k not in ('age', 'last_modified')}
+    return hashlib.sha256(json.dumps(stable, sort_keys=True).encode()).hexdigest()[:12]
+
+def _isoformat(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp is not None else None
+
+class CatalogHistory:
+    """
+    The history of the models, as a log of versions in an SQLite database.
+
+    A version is a model with a given `(host, name, digest)`, alive from the
+    snapshot that first saw it until the snapshot that no longer saw it.
+    Recording a snapshot only writes the versions that were added or removed
+    since the previous snapshot of the host, so the history grows with the
+    amount of change rather than with the size of the catalog. Each version
+    stores its record, zlib-compressed, as of the snapshot that added it.
+
+    Example usage:
+
+        history = CatalogHistory('~/.ollama_data/cache.history.sqlite')
+        history.record(models)
+        history.models_at('2 days')
+        history.changes('1 week')
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize the CatalogHistory object.
+
+        :param path: The path to the database file.
+        """
+        self.path = os.path.expanduser(path)
+
+    def _connect(self) -> sqlite3.Connection:
+        dir_name = os.path.dirname(self.path)
+        if dir_name and not os.path.exists(dir_name):
+            os.makedirs(dir_name, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=60)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.executescript(SCHEMA)
+        except sqlite3.IntegrityError:
+            conn.executescript(DEDUPLICATE + SCHEMA)
+        return conn
+
+    def clear(self) -> None:
+        """
+        Remove the database, e.g., because it is corrupt. It is recreated,
+        empty, by the next `record`.
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    @staticmethod
+    def _hosts_clause(hosts: Any) -> tuple:
+        if hosts is ANY_HOST:
+            return '1', ()
+        hosts = list(hosts)
+        return '(' + ' OR '.join(['host IS ?'] * len(hosts)) + ')', tuple(hosts)
+
+    def record(self,
+               models: List[Dict[str, Any]],
+               host: Optional[str] = None,
+               time: Optional[float] = None) -> Dict[str, int]:
+        """
+        Record a snapshot of the models of a host, in a single transaction,
+        which holds the write lock from the read of the alive versions on,
+        so that concurrent calls see each other's versions.
+
+        :param models: The models. See `OllamaData.get_schema`.
+        :param host: The host of the models, or None.
+        :param time: The POSIX timestamp of the snapshot, or None for now.
+        :return: The number of models, and of versions added and removed.
+        """
+        time = now() if time is None else time
+        current = {(m['name'], get_digest(m)): m for m in models}
+        with closing(self._connect()) as conn, conn:
+            conn.execute('BEGIN IMMEDIATE')
+            alive = {(row['name'], row['digest']): row['id'] for row in conn.execute(
+                'SELECT id, name, digest FROM versions WHERE host IS ? AND removed_at IS NULL',
+                (host,))}
+            removed = [(time, alive[key]) for key in alive.keys() - current.keys()]
+            # In the order of the models, which `models_at` reproduces
+            added = [(host, name, digest, time, zlib.compress(json.dumps(model).encode()))
+                     for (name, digest), model in current.items() if (name, digest) not in alive]
+            conn.executemany('UPDATE versions SET removed_at = ? WHERE id = ?', removed)
+            conn.executemany('INSERT INTO versions (host, name, digest, added_at, record) '
+                             'VALUES (?, ?, ?, ?, ?)', added)
+            conn.execute('INSERT INTO snapshots VALUES (?, ?, ?, ?, ?)',
+                         (host, time, len(current), len(added), len(removed)))
+        return {'models': len(current), 'added': len(added), 'removed': len(removed)}
+
+    def models_at(self,
+                  time: Union[str, float, datetime],
+                  hosts: Iterable[Optional[str]] = ANY_HOST) -> List[Dict[str, Any]]:
+        """
+        Reconstruct the models as of a point in time.
+
+        :param time: The point in time. See `parse_time`.
+        :param hosts: Only the models of these hosts, or `ANY_HOST`.
+        :return: The models, each as recorded by the snapshot that added it.
+        """
+        if not os.path.exists(self.path):
+            return []
+        time = parse_time(time)
+        clause, params = self._hosts_clause(hosts)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                f'SELECT record FROM versions WHERE added_at <= ? '
+                f'AND (removed_at IS NULL OR removed_at > ?) AND {clause} ORDER BY id',
+                (time, time) + params)
+            return [json.loads(zlib.decompress(row['record'])) for row in rows]
+
+    def changes(self,
+                since: Union[str, float, datetime],
+                until: Union[str, float, datetime, None] = None,
+                hosts: Iterable[Optional[str]] = ANY_HOST) -> List[Dict[str, Any]]:
+        """
+        List the changes to the models between two points in time. Each
+        change looks like:
+
+            {'event': 'added' | 'removed' | 'changed',
+             'name': <name>, 'host': <host>, 'time': <ISO date>,
+             'digest': <the new digest, or None if removed>,
+             'previous_digest': <the old digest, or None if added>}
+
+        A model whose digest changed in a snapshot is a single `changed` event.
+
+        :param since: The start of the interval (exclusive). See `parse_time`.
+        :param until: The end of the interval (inclusive), or None for now.
+        :param hosts: Only the models of these hosts, or `ANY_HOST`.
+        :return: The changes, in order of time.
+        """
+        if not os.path.exists(self.path):
+            return []
+        since = parse_time(since)
+        until = now() if until is None else parse_time(until)
+        clause, params = self._hosts_clause(hosts)
+        with closing(self._connect()) as conn:
+            added = conn.execute(
+                f'SELECT host, name, digest, added_at AS time FROM versions '
+                f'WHERE added_at > ? AND added_at <= ? AND {clause}',
+                (since, until) + params).fetchall()
+            removed = conn.execute(
+                f'SELECT host, name, digest, removed_at AS time FROM versions '
+                f'WHERE removed_at > ? AND removed_at <= ? AND {clause}',
+                (since, until) + params).fetchall()
+
+        events = {}
+        for row in removed:
+            events[row['host'], row['name'], row['time']] = {
+                'event': 'removed', 'name': row['name'], 'host': row['host'],
+                'time': row['time'], 'digest': None, 'previous_digest': row['digest']}
+        for row in added:
+            key = (row['host'], row['name'], row['time'])
+            if key in events:
+                events[key].update(event='changed', digest=row['digest'])
+            else:
+                events[key] = {
+                    'event': 'added', 'name': row['name'], 'host': row['host'],
+                    'time': row['time'], 'digest': row['digest'], 'previous_digest': None}
+
+        out = sorted(events.values(), key=lambda e: (e['time'], e['host'] or '', e['name']))
+        for event in out:
+            event['time'] = _isoformat(event['time'])
+        return out
+
+    def snapshots(self, hosts: Iterable[Optional[str]] = ANY_HOST) -> List[Dict[str, Any]]:
+        """
+        List the snapshots, with the number of models and of versions added
+        and removed by each.
+
+        :param hosts: Only the snapshots of these hosts, or `ANY_HOST`.
+        :return: The snapshots, in order of time.
+        """
+        if not os.path.exists(self.path):
+            return []
+        clause, params = self._hosts_clause(hosts)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(f'SELECT * FROM snapshots WHERE {clause} ORDER BY time', params)
+            return [dict(row, time=_isoformat(row['time'])) for row in rows]
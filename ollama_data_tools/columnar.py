@@ -0,0 +1,298 @@
+from array import array
+from collections import Counter
+from datetime import datetime
+from time import time
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class ModelColumns:
+    """
+    A columnar, read-only view of the model catalog for aggregate queries.
+
+    The records returned by `OllamaData.get_models()` are a list of nested
+    dictionaries, which is convenient for JMESPath but slow to scan when we
+    only want a few numeric fields over thousands of models. This class
+    transposes the records into columns once, so that sums, group-bys, top-k
+    and histograms become tight loops (or vectorized NumPy operations, when
+    NumPy is installed) over flat arrays.
+
+    Example usage:
+
+        cols = ModelColumns.from_records(data.get_models())
+        cols.sum('total_weights_size')
+        cols.group_by('family', 'total_weights_size')
+        cols.top_k('total_weights_size', k=5)
+        cols.histogram('age', bins=10)
+
+    Numeric model columns:
+
+        - `total_weights_size`: The total size of the weights (GB).
+        - `last_modified`: The last modification time (POSIX timestamp).
+        - `age`: The age of the model in seconds, relative to when the
+                 columns were built.
+
+    Numeric weight columns (one row per weight file):
+
+        - `weights.file_size`: The size of the weight file (bytes).
+
+    Categorical columns, usable as group-by keys: `name`, `family` (the name
+    without the `:<tag>` suffix), `tag` and `host`.
+    """
+
+    MODEL_COLUMNS = ('total_weights_size', 'last_modified', 'age')
+    WEIGHT_COLUMNS = ('weights.file_size',)
+    KEYS = ('name', 'family', 'tag', 'host')
+
+    def __init__(self, records: Sequence[Dict[str, Any]]):
+        """
+        Initialize the columns from the model records.
+
+        :param records: The model records. See `OllamaData.get_schema`.
+        """
+        now = time()
+        self.names = [r.get('name', '') for r in records]
+        self._labels = {}
+        self._codes = {}
+        self._encode('name', self.names)
+        self._encode('family', [n.rsplit(':', 1)[0] for n in self.names])
+        self._encode('tag', [n.rsplit(':', 1)[1] if ':' in n else 'latest'
+                             for n in self.names])
+        self._encode('host', [r.get('host') or 'local' for r in records])
+
+        sizes = [float(r.get('total_weights_size') or 0.0) for r in records]
+        modified = [_timestamp(r.get('last_modified')) for r in records]
+        self._numeric = {
+            'total_weights_size': _column(sizes, 'd'),
+            'last_modified': _column(modified, 'd'),
+            'age': _column([now - t for t in modified], 'd'),
+        }
+
+        weight_model = []
+        weight_size = []
+        self.weight_hashes = []
+        for i, r in enumerate(records):
+            for w in r.get('weights') or []:
+                weight_model.append(i)
+                weight_size.append(float(w.get('file_size') or 0.0))
+                self.weight_hashes.append(w.get('hash'))
+        self._weight_model = _column(weight_model, 'q')
+        self._numeric['weights.file_size'] = _column(weight_size, 'd')
+
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> 'ModelColumns':
+        """
+        Build the columns from the model records.
+
+        :param records: The model records. See `OllamaData.get_schema`.
+        :return: The columnar view.
+        """
+        return cls(records)
+
+    def __len__(self) -> int:
+        """
+        Get the number of models.
+
+        :return: The number of models.
+        """
+        return len(self.names)
+
+    def column(self, name: str):
+        """
+        Get a numeric column.
+
+        :param name: The name of the column.
+        :return: A NumPy array, or an `array.array` if NumPy is not installed.
+        :raises ValueError: If the column is unknown.
+        """
+        if name not in self._numeric:
+            raise ValueError(f"Unknown column: {name}")
+        return self._numeric[name]
+
+    def labels(self, key: str) -> List[str]:
+        """
+        Get the distinct values of a categorical column.
+
+        :param key: The categorical column, e.g., "family".
+        :return: The distinct values, in order of first appearance.
+        """
+        self._check_key(key)
+        return self._labels[key]
+
+    def sum(self, column: str) -> float:
+        """
+        Sum a numeric column.
+
+        :param column: The name of the column.
+        :return: The sum of the column.
+        """
+        values = self.column(column)
+        if np is not None:
+            return float(values.sum())
+        return float(sum(values))
+
+    def group_by(self,
+                 key: str,
+                 column: str = 'total_weights_size',
+                 agg: str = 'sum') -> Dict[str, float]:
+        """
+        Aggregate a numeric column by a categorical column.
+
+        :param key: The categorical column to group by, e.g., "family".
+        :param column: The numeric column to aggregate.
+        :param agg: One of "sum", "count", "mean", "min" or "max".
+        :return: A dictionary mapping each group to its aggregate.
+        :raises ValueError: If the key, column or aggregate is unknown.
+        """
+        if agg not in ('sum', 'count', 'mean', 'min', 'max'):
+            raise ValueError(f"Unknown aggregate: {agg}")
+        self._check_key(key)
+        values = self.column(column)
+        codes = self._row_codes(key, column)
+        labels = self._labels[key]
+        n = len(labels)
+
+        if np is not None:
+            counts = np.bincount(codes, minlength=n)
+            if agg == 'count':
+                out = counts.astype(float)
+            elif agg in ('sum', 'mean'):
+                out = np.bincount(codes, weights=values, minlength=n)
+                if agg == 'mean':
+                    out = out / np.maximum(counts, 1)
+            else:
+                fill = np.inf if agg == 'min' else -np.inf
+                out = np.full(n, fill)
+                (np.minimum if agg == 'min' else np.maximum).at(out, codes, values)
+            return {labels[i]: float(out[i]) for i in range(n) if counts[i]}
+
+        counts = [0] * n
+        out = [None] * n
+        for c, v in zip(codes, values):
+            counts[c] += 1
+            if agg in ('sum', 'mean', 'count'):
+                out[c] = (out[c] or 0.0) + (1.0 if agg == 'count' else v)
+            elif out[c] is None:
+                out[c] = v
+            else:
+                out[c] = min(out[c], v) if agg == 'min' else max(out[c], v)
+        if agg == 'mean':
+            out = [o / c if c else None for o, c in zip(out, counts)]
+        return {labels[i]: float(out[i]) for i in range(n) if counts[i]}
+
+    def top_k(self,
+              column: str = 'total_weights_size',
+              k: int = 10,
+              key: str = 'name',
+              largest: bool = True) -> List[Tuple[str, float]]:
+        """
+        Get the rows with the largest (or smallest) values of a column.
+
+        :param column: The numeric column to rank by.
+        :param k: The number of rows to return.
+        :param key: The categorical column used to label the rows.
+        :param largest: Whether to return the largest or the smallest values.
+        :return: A list of `(label, value)` pairs, ordered by value.
+        """
+        self._check_key(key)
+        values = self.column(column)
+        codes = self._row_codes(key, column)
+        labels = self._labels[key]
+        k = min(k, len(values))
+        if k <= 0:
+            return []
+
+        if np is not None:
+            ranked = -values if largest else values
+            idx = np.argpartition(ranked, k - 1)[:k]
+            idx = idx[np.argsort(ranked[idx], kind='stable')]
+        else:
+            idx = sorted(range(len(values)), key=values.__getitem__,
+                         reverse=largest)[:k]
+        return [(labels[codes[i]], float(values[i])) for i in idx]
+
+    def histogram(self,
+                  column: str,
+                  bins: int = 10,
+                  bounds: Optional[Tuple[float, float]] = None
+                  ) -> Tuple[List[int], List[float]]:
+        """
+        Compute a histogram of a numeric column over equal-width bins.
+
+        :param column: The numeric column.
+        :param bins: The number of bins.
+        :param bounds: The `(low, high)` range of the bins. Defaults to the
+                      minimum and maximum of the column.
+        :return: A tuple of the bin counts and the `bins + 1` bin edges.
+        """
+        values = self.column(column)
+        if np is not None:
+            counts, edges = np.histogram(values, bins=bins, range=bounds)
+            return counts.tolist(), edges.tolist()
+
+        if bounds is None:
+            bounds = (min(values), max(values)) if len(values) else (0.0, 1.0)
+        lo, hi = bounds
+        if hi <= lo:
+            lo, hi = lo - 0.5, hi + 0.5
+        width = (hi - lo) / bins
+        counts = [0] * bins
+        for v in values:
+            if lo <= v <= hi:
+                counts[min(int((v - lo) / width), bins - 1)] += 1
+        return counts, [lo + i * width for i in range(bins + 1)]
+
+    def blob_sharing(self) -> Dict[str, int]:
+        """
+        Count how many models reference each weight blob.
+
+        :return: A dictionary mapping each weight hash to its number of models.
+        """
+        return dict(Counter(h for h in self.weight_hashes if h))
+
+    def _encode(self, key: str, values: List[str]) -> None:
+        index = {}
+        codes = [index.setdefault(v, len(index)) for v in values]
+        self._labels[key] = list(index)
+        self._codes[key] = _column(codes, 'q')
+
+    def _row_codes(self, key: str, column: str):
+        codes = self._codes[key]
+        if column not in self.WEIGHT_COLUMNS:
+            return codes
+        if np is not None:
+            return codes[self._weight_model]
+        return array('q', (codes[i] for i in self._weight_model))
+
+    def _check_key(self, key: str) -> None:
+        if key not in self._codes:
+            raise ValueError(f"Unknown key: {key}")
+
+def _column(values: List[Any], typecode: str):
+    """
+    Build a column from a list of values.
+
+    :param values: The values of the column.
+    :param typecode: The `array` typecode, "d" for floats or "q" for integers.
+    :return: A NumPy array if NumPy is installed, otherwise an `array.array`.
+    """
+    if np is not None:
+        return np.asarray(values, dtype=np.float64 if typecode == 'd' else np.int64)
+    return array(typecode, values)
+
+def _timestamp(value: Optional[str]) -> float:
+    """
+    Convert an ISO date string to a POSIX timestamp.
+
+    :param value: The ISO date string.
+    :return: The timestamp, or 0.0 if the value is missing or malformed.
+    """
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return 0.0
@@ -0,0 +1,229 @@
+import sys
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+AGE_KEYS = ('days', 'seconds', 'years', 'months', 'weeks', 'hours', 'minutes')
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if isinstance(value, str) else value
+
+def _to_timestamp(value: Optional[str]) -> Optional[float]:
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+def _from_timestamp(value: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(value).isoformat() if value is not None else None
+
+class Weight:
+    """
+    A compact weight record. The file name and directory are derived from the
+    file path, the dates are POSIX timestamps, and the strings are interned.
+    """
+
+    __slots__ = ('hash', 'file_path', 'file_size', 'file_size_units',
+                 'last_modification', 'metadata_change_time')
+
+    def __init__(self,
+                 hash: Optional[str],
+                 file_path: str,
+                 file_size: Optional[float] = None,
+                 file_size_units: Optional[str] = None,
+                 last_modification: Optional[float] = None,
+                 metadata_change_time: Optional[float] = None):
+        self.hash = _intern(hash)
+        self.file_path = _intern(file_path)
+        self.file_size = file_size
+        self.file_size_units = _intern(file_size_units)
+        self.last_modification = last_modification
+        self.metadata_change_time = metadata_change_time
+
+    @property
+    def file_name(self) -> str:
+        return self.file_path.rpartition('/')[2]
+
+    @property
+    def dir(self) -> str:
+        head, sep, _ = self.file_path.rpartition('/')
+        return head or sep or '.'
+
+    @classmethod
+    def from_dict(cls, weight: Dict[str, Any]) -> 'Weight':
+        """
+        Build a compact weight from a weight dictionary.
+
+        :param weight: The weight. See `OllamaData.get_schema`.
+        :return: The compact weight.
+        """
+        return cls(weight.get('hash'),
+                   weight['file_path'],
+                   weight.get('file_size'),
+                   weight.get('file_size_units'),
+                   _to_timestamp(weight.get('last_modification')),
+                   _to_timestamp(weight.get('metadata_change_time')))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the dictionary view of the weight. Missing fields are omitted,
+        except `hash`, which is None if the weight is not a blob.
+
+        :return: The weight. See `OllamaData.get_schema`.
+        """
+        head, sep, file_name = self.file_path.rpartition('/')
+        weight = {'file_name': file_name, 'file_path': self.file_path}
+        if self.file_size is not None:
+            weight['file_size'] = self.file_size
+        if self.file_size_units is not None:
+            weight['file_size_units'] = self.file_size_units
+        if self.last_modification is not None:
+            weight['last_modification'] = _from_timestamp(self.last_modification)
+        if self.metadata_change_time is not None:
+            weight['metadata_change_time'] = _from_timestamp(self.metadata_change_time)
+        weight['hash'] = self.hash
+        weight['dir'] = head or sep or '.'
+        return weight
+
+class Layer:
+    """
+    A compact layer record.
+    """
+
+    __slots__ = ('hash', 'media_type', 'file_size')
+
+    def __init__(self, hash: str, media_type: Optional[str], file_size: int):
+        self.hash = _intern(hash)
+        self.media_type = _intern(media_type)
+        self.file_size = file_size
+
+    @classmethod
+    def from_dict(cls, layer: Dict[str, Any]) -> 'Layer':
+        """
+        Build a compact layer from a layer dictionary.
+
+        :param layer: The layer. See `OllamaData.get_schema`.
+        :return: The compact layer.
+        """
+        return cls(layer.get('hash'), layer.get('media_type'), layer.get('file_size'))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the dictionary view of the layer.
+
+        :return: The layer. See `OllamaData.get_schema`.
+        """
+        return {'hash': self.hash,
+                'media_type': self.media_type,
+                'file_size': self.file_size}
+
+class Model:
+    """
+    A compact model record, for holding large catalogs in memory.
+
+    Compared to the dictionary records, the keys live once in `__slots__`,
+    the strings (names, units, hashes, templates, modelfiles, ...) are
+    interned so that models sharing them, e.g., the same model on many hosts,
+    share one copy, the dates are POSIX timestamps, and the age is a tuple of
+    ints in the order of `AGE_KEYS`.
+
+    `to_dict` gives the dictionary view expected by JMESPath and the CLIs,
+    and `Model.from_dict(m).to_dict() == m` for the records of `get_models`.
+    """
+
+    __slots__ = ('name', 'host', 'last_modified', 'age', 'model_params',
+                 'system_message', 'template', 'modelfile', 'total_weights_size',
+                 'total_weights_size_units', 'weights', 'layers', 'extra')
+
+    def __init__(self,
+                 name: str,
+                 host: Optional[str],
+                 last_modified: Optional[float],
+                 age: Tuple[int, ...],
+                 model_params: Tuple[Tuple[str, str], ...],
+                 system_message: Optional[str],
+                 template: Tuple[str, ...],
+                 modelfile: Optional[str],
+                 total_weights_size: float,
+                 total_weights_size_units: str,
+                 weights: Tuple[Weight, ...],
+                 layers: Optional[Tuple[Layer, ...]] = None,
+                 extra: Optional[Dict[str, Any]] = None):
+        self.name = _intern(name)
+        self.host = _intern(host)
+        self.last_modified = last_modified
+        self.age = age
+        self.model_params = tuple((_intern(k), _intern(v)) for k, v in model_params)
+        self.system_message = _intern(system_message)
+        self.template = tuple(_intern(line) for line in template)
+        self.modelfile = _intern(modelfile)
+        self.total_weights_size = total_weights_size
+        self.total_weights_size_units = _intern(total_weights_size_units)
+        self.weights = weights
+        self.layers = layers
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, model: Dict[str, Any]) -> 'Model':
+        """
+        Build a compact model from a model dictionary.
+
+        :param model: The model. See `OllamaData.get_schema`.
+        :return: The compact model.
+        """
+        age = model.get('age') or {}
+        layers = model.get('layers')
+        extra = {k: v for k, v in model.items() if k not in cls.__slots__}
+        return cls(model['name'],
+                   model.get('host'),
+                   _to_timestamp(model.get('last_modified')),
+                   tuple(age.get(k, 0) for k in AGE_KEYS),
+                   tuple((model.get('model_params') or {}).items()),
+                   model.get('system_message'),
+                   tuple(model.get('template') or ()),
+                   model.get('modelfile'),
+                   model.get('total_weights_size', 0.0),
+                   model.get('total_weights_size_units', 'GB'),
+                   tuple(Weight.from_dict(w) for w in model.get('weights') or ()),
+                   tuple(Layer.from_dict(l) for l in layers) if layers is not None else None,
+                   extra or None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the dictionary view of the model.
+
+        :return: The model. See `OllamaData.get_schema`.
+        """
+        model = {
+            'name': self.name,
+            'last_modified': _from_timestamp(self.last_modified),
+            'age': dict(zip(AGE_KEYS, self.age)),
+            'model_params': dict(self.model_params),
+            'system_message': self.system_message,
+            'template': list(self.template),
+            'modelfile': self.modelfile,
+            'total_weights_size': self.total_weights_size,
+            'total_weights_size_units': self.total_weights_size_units,
+            'weights': [w.to_dict() for w in self.weights],
+        }
+        if self.layers is not None:
+            model['layers'] = [l.to_dict() for l in self.layers]
+        if self.host is not None:
+            model['host'] = self.host
+        if self.extra:
+            model.update(self.extra)
+        return model
+
+def from_dicts(models: Sequence[Dict[str, Any]]) -> List[Model]:
+    """
+    Build compact models from model dictionaries.
+
+    :param models: The models. See `OllamaData.get_schema`.
+    :return: The compact models.
+    """
+    return [Model.from_dict(m) for m in models]
+
+def to_dicts(models: Sequence[Model]) -> List[Dict[str, Any]]:
+    """
+    Get the dictionary views of compact models.
+
+    :param models: The compact models.
+    :return: The models. See `OllamaData.get_schema`.
+    """
+    return [m.to_dict() for m in models]
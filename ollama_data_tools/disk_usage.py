@@ -0,0 +1,156 @@
+from collections import defaultdict
+from typing import Dict, Any, Iterable, Sequence
+from ollama_data_tools import conversion_tools as ct
+
+class DiskUsage:
+    """
+    Deduplicated disk-usage accounting for the model store.
+
+    Models frequently share blobs (a base model and its fine-tunes, or two
+    tags of the same model), so summing `total_weights_size` over the models
+    double-counts the shared blobs. This class builds a blob -> models reverse
+    index from the `weights[*].hash` and `layers[*].hash` values of the model
+    records, in a single pass over the catalog, and answers:
+
+        - How many bytes does the store actually use? (`unique_bytes`)
+        - How many bytes does each model use that no other model uses?
+          (`exclusive_bytes`)
+        - How many bytes would removing a set of models free?
+          (`reclaimable_bytes`)
+
+    Example usage:
+
+        du = DiskUsage(data.get_models())
+        du.unique_bytes()
+        du.exclusive_bytes()['mistral:latest']
+        du.reclaimable_bytes(['mistral:latest', 'mistral:7b'])
+
+    If the records are tagged with a `host`, blobs on different hosts are
+    distinct, and models are named `<name>@<host>`. See `DiskUsage.key`.
+    """
+
+    @staticmethod
+    def key(record: Dict[str, Any]) -> str:
+        """
+        Get the name of a model in the disk usage accounting.
+
+        :param record: The model record.
+        :return: `<name>` or, if the model is tagged with a host, `<name>@<host>`.
+        """
+        if record.get('host'):
+            return f"{record['name']}@{record['host']}"
+        return record['name']
+
+    def __init__(self, records: Sequence[Dict[str, Any]]):
+        """
+        Build the reverse index from the model records.
+
+        :param records: The model records. See `OllamaData.get_schema`.
+        """
+        self.blob_size = {}
+        self.blob_models = defaultdict(set)
+        self.model_blobs = {}
+
+        for record in records:
+            model = self.key(record)
+            host = record.get('host')
+            blobs = self.model_blobs.setdefault(model, set())
+            for weight in record.get('weights') or []:
+                size = weight.get('file_size')
+                if size is not None:
+                    size = ct.convert_bytes(size, weight.get('file_size_units', 'B'), 'B')
+                self._add(model, blobs, host, weight.get('hash'), size)
+            for layer in record.get('layers') or []:
+                self._add(model, blobs, host, layer.get('hash'), layer.get('file_size'))
+
+    def _add(self, model: str, blobs: set, host: str, blob: str, size: float) -> None:
+        if not blob:
+            return
+        blob = (host, blob)
+        blobs.add(blob)
+        self.blob_models[blob].add(model)
+        if size is not None:
+            self.blob_size[blob] = int(size)
+
+    def unique_bytes(self) -> int:
+        """
+        Get the bytes used by the store, counting each blob once.
+
+        :return: The number of bytes.
+        """
+        return sum(self.blob_size.values())
+
+    def apparent_bytes(self) -> int:
+        """
+        Get the bytes used by the store if each model's blobs were counted
+        independently, i.e., with shared blobs counted once per model.
+
+        :return: The number of bytes.
+        """
+        return sum(self.blob_size.get(b, 0) * len(m)
+                   for b, m in self.blob_models.items())
+
+    def model_bytes(self) -> Dict[str, int]:
+        """
+        Get the bytes referenced by each model, shared or not.
+
+        :return: A dictionary mapping each model to its number of bytes.
+        """
+        return {model: sum(self.blob_size.get(b, 0) for b in blobs)
+                for model, blobs in self.model_blobs.items()}
+
+    def exclusive_bytes(self) -> Dict[str, int]:
+        """
+        Get the bytes referenced by each model and by no other model.
+
+        :return: A dictionary mapping each model to its number of bytes.
+        """
+        out = dict.fromkeys(self.model_blobs, 0)
+        for blob, models in self.blob_models.items():
+            if len(models) == 1:
+                (model,) = models
+                out[model] += self.blob_size.get(blob, 0)
+        return out
+
+    def reclaimable_bytes(self, models: Iterable[str]) -> int:
+        """
+        Get the bytes that removing a set of models would free, i.e., the
+        bytes of the blobs referenced only by models in the set.
+
+        :param models: The names of the models to remove.
+        :return: The number of bytes.
+        :raises ValueError: If a model is not in the catalog.
+        """
+        models = set(models)
+        unknown = models - self.model_blobs.keys()
+        if unknown:
+            raise ValueError(f"Unknown models: {', '.join(sorted(unknown))}")
+
+        blobs = set()
+        for model in models:
+            blobs.update(self.model_blobs[model])
+        return sum(self.blob_size.get(b, 0) for b in blobs
+                   if self.blob_models[b] <= models)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Get a JSON-compatible report of the disk usage of the store and of
+        each model. All sizes are in bytes.
+
+        :return: A dictionary with the totals and a per-model breakdown.
+        """
+        exclusive = self.exclusive_bytes()
+        models = []
+        for model, size in self.model_bytes().items():
+            models.append({
+                'name': model,
+                'bytes': size,
+                'exclusive_bytes': exclusive[model],
+                'shared_bytes': size - exclusive[model],
+            })
+        return {
+            'unique_bytes': self.unique_bytes(),
+            'apparent_bytes': self.apparent_bytes(),
+            'blobs': len(self.blob_models),
+            'models': models,
+        }
@@ -0,0 +1,378 @@
+import json
+import socket
+import logging
+import threading
+import subprocess
+from time import time, sleep
+from collections import OrderedDict
+from urllib import request, error
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, List, Optional, Callable
+from ollama_data_tools import conversion_tools as ct
+
+logger = logging.getLogger(__name__)
+
+def _free_port() -> int:
+    """
+    Get a free local TCP port.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def model_bytes(model: Dict[str, Any]) -> int:
+    """
+    Get the size in bytes of the weights of a model, which we use as an
+    estimate of the memory an engine needs to serve it.
+
+    :param model: The model. See `OllamaData.get_schema`.
+    :return: The number of bytes.
+    """
+    return int(ct.convert_bytes(model.get('total_weights_size') or 0,
+                                model.get('total_weights_size_units', 'GB'), 'B'))
+
+class EngineProcess:
+    """
+    A running engine that serves one model over HTTP on a local port, e.g.,
+    the llama.cpp server.
+    """
+
+    def __init__(self, name: str, args: List[str], port: int, size: int):
+        """
+        Initialize the engine. It runs once `start` is called.
+
+        :param name: The name of the model.
+        :param args: The command line of the engine.
+        :param port: The local port the engine listens on.
+        :param size: The estimated memory of the engine in bytes.
+        """
+        self.name = name
+        self.args = args
+        self.port = port
+        self.size = size
+        self.url = f"http://127.0.0.1:{port}"
+        self.in_use = 0
+        self.ready = threading.Event()
+        self.error = None
+        self.process = None
+        self.stopped = False
+
+    def start(self) -> None:
+        """
+        Start the engine.
+
+        :raises RuntimeError: If the engine was stopped before it started.
+        """
+        if self.stopped:
+            raise RuntimeError(f"Engine for '{self.name}' was stopped before it started.")
+        self.process = subprocess.Popen(self.args, stdin=subprocess.DEVNULL)
+
+    def alive(self) -> bool:
+        """
+        Check if the engine is still running, or has yet to start.
+        """
+        return not self.stopped and (self.process is None or self.process.poll() is None)
+
+    def wait_ready(self, timeout: float) -> None:
+        """
+        Wait until the engine answers `GET /health` with 200, i.e., until it
+        has loaded the model.
+
+        :param timeout: The time in seconds to wait.
+        :raises RuntimeError: If the engine exits or is not ready in time.
+        """
+        deadline = time() + timeout
+        while time() < deadline:
+            if not self.alive():
+                raise RuntimeError(f"Engine for '{self.name}' exited with status {self.process.returncode}.")
+            try:
+                with request.urlopen(self.url + '/health', timeout=1) as response:
+                    if response.status == 200:
+                        return
+            except (OSError, error.HTTPError):
+                pass
+            sleep(0.1)
+        raise RuntimeError(f"Engine for '{self.name}' was not ready after {timeout} seconds.")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """
+        Stop the engine, killing it if it does not exit in time.
+
+        :param timeout: The time in seconds to wait for the engine to exit.
+        """
+        self.stopped = True
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+
+class EnginePool:
+    """
+    A bounded pool of warm engine processes, one per recently used model.
+
+    Starting an engine means loading the model's weights, which dominates the
+    time of short jobs. The pool keeps the engines running between requests,
+    so a request for a model that is already loaded goes to its warm engine.
+    When a new engine would exceed `max_engines` or `memory_budget`, the least
+    recently used idle engines are stopped first.
+
+    Example usage:
+
+        pool = EnginePool(lambda model, port: [...], max_engines=2)
+        engine = pool.acquire(data.get_model('mistral'))
+        try:
+            ...  # send requests to engine.url
+        finally:
+            pool.release(engine)
+        pool.close()
+    """
+
+    def __init__(self,
+                 args_builder: Callable[[Dict[str, Any], int], List[str]],
+                 max_engines: int = 2,
+                 memory_budget: Optional[int] = None,
+                 ready_timeout: float = 300.0):
+        """
+        Initialize the pool.
+
+        :param args_builder: A function that, given a model and a port, returns
+                             the command line of an engine that serves the
+                             model on that port.
+        :param max_engines: The maximum number of running engines.
+        :param memory_budget: The maximum total memory of the running engines
+                              in bytes, estimated by `model_bytes`, or None
+                              for no limit.
+        :param ready_timeout: The time in seconds to wait for an engine to
+                              load its model.
+        """
+        if max_engines < 1:
+            raise ValueError("The pool needs room for at least one engine.")
+        self.args_builder = args_builder
+        self.max_engines = max_engines
+        self.memory_budget = memory_budget
+        self.ready_timeout = ready_timeout
+        self.engines = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def acquire(self, model: Dict[str, Any]) -> EngineProcess:
+        """
+        Get the engine of a model, starting it if it is not running, and mark
+        it as in use until `release`.
+
+        :param model: The model. See `OllamaData.get_schema`.
+        :return: The engine, ready to serve requests.
+        :raises RuntimeError: If the engine fails to start.
+        """
+        name = model['name']
+        with self.lock:
+            engine = self.engines.get(name)
+            if engine is not None and (engine.error or not engine.alive()):
+                del self.engines[name]
+                engine = None
+            evicted = []
+            if engine is None:
+                self.misses += 1
+                size = model_bytes(model)
+                evicted = self._evict(size)
+                port = _free_port()
+                engine = EngineProcess(name, self.args_builder(model, port), port, size)
+                self.engines[name] = engine
+                starting = True
+            else:
+                self.hits += 1
+                starting = False
+            self.engines.move_to_end(name)
+            engine.in_use += 1
+
+        # Stopping an engine can take a while, so it is done without the
+        # lock, but before the new engine starts, to free its memory first
+        for evicted_engine in evicted:
+            evicted_engine.stop()
+
+        if starting:
+            logger.info(f"Starting engine for '{name}' on port {engine.port}")
+            try:
+                engine.start()
+                engine.wait_ready(self.ready_timeout)
+            except (OSError, RuntimeError) as e:
+                # OSError if the engine cannot be executed at all
+                engine.error = e
+                engine.stop()
+            finally:
+                engine.ready.set()
+        else:
+            engine.ready.wait()
+
+        if engine.error:
+            self.release(engine)
+            raise RuntimeError(str(engine.error))
+        return engine
+
+    def release(self, engine: EngineProcess) -> None:
+        """
+        Mark an engine acquired with `acquire` as no longer in use.
+
+        :param engine: The engine.
+        """
+        with self.lock:
+            engine.in_use -= 1
+
+    def _evict(self, size: int) -> List[EngineProcess]:
+        """
+        Remove the least recently used idle engines from the pool until there
+        is room for an engine of the given size. Must be called with the lock
+        held. The caller stops the evicted engines after releasing the lock.
+
+        :param size: The estimated memory of the new engine in bytes.
+        :return: The evicted engines.
+        """
+        def _full():
+            if len(self.engines) >= self.max_engines:
+                return True
+            used = sum(e.size for e in self.engines.values())
+            return self.memory_budget is not None and used + size > self.memory_budget
+
+        evicted = []
+        for name, engine in list(self.engines.items()):
+            if not _full():
+                return evicted
+            if engine.in_use == 0:
+                logger.info(f"Evicting engine for '{name}'")
+                del self.engines[name]
+                evicted.append(engine)
+        if _full():
+            logger.warning("All engines are busy; starting one beyond the pool limits.")
+        return evicted
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get the status of the pool.
+
+        :return: A JSON-compatible dictionary with the running engines, from
+                 least to most recently used, and the hit and miss counts.
+        """
+        with self.lock:
+            return {
+                'engines': [{'name': e.name, 'port': e.port,
+                             'pid': e.process.pid if e.process else None,
+                             'bytes': e.size, 'in_use': e.in_use,
+                             'ready': e.ready.is_set() and not e.error}
+                            for e in self.engines.values()],
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+    def close(self) -> None:
+        """
+        Stop all the engines.
+        """
+        with self.lock:
+            engines = list(self.engines.values())
+            self.engines.clear()
+        for engine in engines:
+            engine.stop()
+
+def serve(pool: EnginePool,
+          resolve: Callable[[str], Dict[str, Any]],
+          host: str = '127.0.0.1',
+          port: int = 8080) -> None:
+    """
+    Serve the engines of a pool over HTTP until interrupted, then stop them.
+
+    A `POST` to any path, e.g., `/completion`, whose JSON body names a
+    `model` is forwarded, body and path unchanged, to the warm engine of that
+    model, and the engine's response is streamed back. `GET /pool` returns
+    `EnginePool.status`.
+
+    :param pool: The pool of engines.
+    :param resolve: A function that maps the model name of a request to a
+                    model, e.g., `OllamaData.get_model`, raising `ValueError`
+                    if there is no such model (answered with 404), or
+                    `RuntimeError` or `OSError` if the models cannot be
+                    listed, e.g., because `ollama` or a host fails
+                    (answered with 502).
+    :param host: The address to listen on.
+    :param port: The port to listen on.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def _send_json(self, status, obj):
+            body = json.dumps(obj).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == '/pool':
+                self._send_json(200, pool.status())
+            else:
+                self._send_json(404, {'error': f"Unknown path: {self.path}"})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            try:
+                name = json.loads(body)['model']
+            except (ValueError, KeyError, TypeError):
+                self._send_json(400, {'error': "Expected a JSON body with a 'model'."})
+                return
+            try:
+                model = resolve(name)
+            except ValueError as e:
+                self._send_json(404, {'error': str(e)})
+                return
+            except (RuntimeError, OSError) as e:
+                logger.error(f"Cannot resolve model '{name}': {e}")
+                self._send_json(502, {'error': str(e)})
+                return
+
+            try:
+                engine = pool.acquire(model)
+            except RuntimeError as e:
+                self._send_json(502, {'error': str(e)})
+                return
+
+            headers_sent = False
+            try:
+                req = request.Request(engine.url + self.path, data=body, headers={
+                    'Content-Type': self.headers.get('Content-Type', 'application/json')})
+                try:
+                    response = request.urlopen(req)
+                except error.HTTPError as e:
+                    response = e
+                with response:
+                    headers_sent = True
+                    self.send_response(response.getcode())
+                    for key, value in response.headers.items():
+                        if key.lower() not in ('connection', 'transfer-encoding', 'server', 'date'):
+                            self.send_header(key, value)
+                    self.end_headers()
+                    read = getattr(response, 'read1', response.read)
+                    for chunk in iter(lambda: read(65536), b''):
+                        self.wfile.write(chunk)
+                        self.wfile.flush()
+            except OSError as e:
+                logger.error(f"Request to engine for '{engine.name}' failed: {e}")
+                if not headers_sent:
+                    try:
+                        self._send_json(502, {'error': f"Request to engine failed: {e}"})
+                    except OSError:
+                        pass
+            finally:
+                pool.release(engine)
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    logger.info(f"Serving engines on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        pool.close()
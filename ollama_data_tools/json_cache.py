@@ -1,5 +1,6 @@
 import os
 import json
+import tempfile
 from time import time
 from typing import Dict, Any, Union
 from ollama_data_tools import conversion_tools as ct
@@ -73,13 +74,16 @@ class JsonCache:
         if os.path.exists(self.path):
             os.remove(self.path)
 
-    def load(self) -> Dict[str, Any]:
+    def load(self, allow_expired: bool = False) -> Dict[str, Any]:
         """
         Load the cache file from disk.
 
+        :param allow_expired: Whether to load the cache file even if it has
+                              expired, e.g., as a fallback when the data
+                              cannot be regenerated.
         :return: The content of the cache file as a dictionary.
         """
-        if not self.is_valid():
+        if not self.is_valid() and not (allow_expired and os.path.exists(self.path)):
             raise RuntimeError("Cache is invalid.")
         
         with open(self.path, 'r') as file:
@@ -87,13 +91,22 @@ class JsonCache:
 
     def save(self, data: Dict[str, Any]) -> None:
         """
-        Save data to the cache file.
+        Save data to the cache file. The data is written to a temporary file
+        that then replaces the cache file, so a reader, or a process that
+        exits mid-write, never leaves a partially written cache.
 
         :param data: The data to cache.
         """
         dir_name = os.path.dirname(self.path)
-        if not os.path.exists(dir_name):
-            os.makedirs(dir_name)
-
-        with open(self.path, 'w') as file:
-            json.dump(data, file, indent=4)
+        if dir_name and not os.path.exists(dir_name):
+            os.makedirs(dir_name, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(dir=dir_name or None,
+                                        prefix=os.path.basename(self.path) + '.')
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump(data, file, indent=4)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,160 @@
+import json
+import hashlib
+from pathlib import PurePosixPath
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib import request, parse
+from typing import Dict, List, Any, Optional
+from dateutil.parser import isoparse
+from dateutil.relativedelta import relativedelta
+from ollama_data_tools import ollama_data_utils as odu
+from ollama_data_tools import conversion_tools as ct
+
+DEFAULT_PORT = 11434
+
+def normalize_host(host: str) -> str:
+    """
+    Normalizes an `OLLAMA_HOST`-style endpoint into a base URL, using the same
+    defaults as `ollama`: the scheme defaults to `http`, and the port defaults
+    to 11434, or to 80 and 443 if the scheme is given explicitly.
+
+        node1             -> http://node1:11434
+        node1:8080        -> http://node1:8080
+        https://node1     -> https://node1:443
+
+    :param host: The endpoint.
+    :return: The base URL of the endpoint.
+    """
+    host = host.strip().rstrip('/')
+    if '://' in host:
+        scheme, hostport = host.split('://', 1)
+        default_port = 443 if scheme == 'https' else 80
+    else:
+        scheme, hostport, default_port = 'http', host, DEFAULT_PORT
+
+    url = parse.urlsplit(f"{scheme}://{hostport}")
+    port = url.port or default_port
+    hostname = url.hostname or '127.0.0.1'
+    if ':' in hostname:
+        hostname = f"[{hostname}]"
+    return f"{scheme}://{hostname}:{port}{url.path}"
+
+def call(host: str,
+         path: str,
+         payload: Optional[Dict[str, Any]] = None,
+         timeout: float = 10.0) -> Dict[str, Any]:
+    """
+    Calls an endpoint of the Ollama HTTP API.
+
+    :param host: The base URL of the host. See `normalize_host`.
+    :param path: The path of the endpoint, e.g., "/api/tags".
+    :param payload: The JSON body to POST, or None to GET.
+    :param timeout: The timeout in seconds.
+    :return: The JSON response.
+    :raises RuntimeError: If the request fails.
+    """
+    data = json.dumps(payload).encode() if payload is not None else None
+    req = request.Request(host + path, data=data,
+                          headers={'Content-Type': 'application/json'})
+    try:
+        with request.urlopen(req, timeout=timeout) as response:
+            return json.load(response)
+    except (OSError, ValueError) as e:
+        raise RuntimeError(f"{host}{path} failed with error: {e}")
+
+def get_models(host: str,
+               timeout: float = 10.0,
+               max_workers: int = 8) -> List[Dict[str, Any]]:
+    """
+    Generates a list of dictionaries containing information about all models
+    on a host, using the Ollama HTTP API (`/api/tags` and `/api/show`). The
+    `/api/show` requests of the models are issued concurrently, so the time
+    taken grows with the number of models divided by `max_workers`.
+
+    The weights are on the host, so their paths are paths on the host and
+    we cannot stat them. The size of a model's weights is the size reported
+    by `/api/tags`, which is attributed to its weight file when the model has
+    a single one.
+
+    :param host: The base URL of the host. See `normalize_host`.
+    :param timeout: The timeout in seconds of each request.
+    :param max_workers: The maximum number of concurrent requests.
+    :return: A list of dictionaries with model information.
+    """
+    tags = call(host, '/api/tags', timeout=timeout).get('models', [])
+    if not tags:
+        return []
+
+    def _show(tag):
+        return call(host, '/api/show', {'name': tag['name']}, timeout=timeout)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tags)))) as executor:
+        shows = list(executor.map(_show, tags))
+    return [make_model(tag, show) for tag, show in zip(tags, shows)]
+
+def make_model(tag: Dict[str, Any], show: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Builds the information about a model from the responses of the Ollama
+    HTTP API. See `get_models`.
+
+    :param tag: The entry of the model in the response of `/api/tags`.
+    :param show: The response of `/api/show` for the model.
+    :return: A dictionary with model information.
+    """
+    model_name = tag['name']
+    modified = isoparse(tag['modified_at']).astimezone().replace(tzinfo=None)
+    dur = relativedelta(datetime.now(), modified).normalized()
+    size = tag.get('size', 0)
+
+    weight_infos = []
+    weight_paths = odu.parse_weights_path(show.get('modelfile', ''))
+    for weight_path in weight_paths:
+        weight_path = PurePosixPath(weight_path)
+        weight_info = {
+            'file_name': weight_path.name,
+            'file_path': str(weight_path),
+            'hash': odu.parse_weight_hash(weight_path),
+            'dir': str(weight_path.parent),
+        }
+        if len(weight_paths) == 1:
+            weight_info['file_size'] = size
+            weight_info['file_size_units'] = 'B'
+        weight_infos.append(weight_info)
+
+    return {
+        'name': model_name,
+        # The ID shown by `ollama list`, i.e., the digest of the manifest
+        'digest': (tag.get('digest') or '')[:12] or None,
+        'last_modified': modified.isoformat(),
+        'age': {
+            "days": dur.days,
+            "seconds": dur.seconds,
+            "years": dur.years,
+            "months": dur.months,
+            "weeks": dur.weeks,
+            "hours": dur.hours,
+            "minutes": dur.minutes,
+        },
+        'model_params': odu.parse_model_params(show.get('parameters', '')),
+        'system_message': show.get('system', ''),
+        'template': odu.parse_model_template(show.get('template', '')),
+        'modelfile': show.get('modelfile'),
+        'total_weights_size': ct.convert_bytes(size, 'B', 'GB'),
+        'total_weights_size_units': 'GB',
+        'weights': weight_infos,
+        'layers': []
+    }
+
+def get_tags_fingerprint(host: str, timeout: float = 10.0) -> str:
+    """
+    Returns a fingerprint of the names, digests and modification times of the
+    models on a host, which is cheap to poll compared to `get_models`.
+
+    :param host: The base URL of the host. See `normalize_host`.
+    :param timeout: The timeout in seconds.
+    :return: The fingerprint.
+    """
+    tags = call(host, '/api/tags', timeout=timeout)
+    models = sorted((m.get('name'), m.get('digest'), m.get('modified_at'))
+                    for m in tags.get('models', []))
+    return hashlib.sha256(repr(models).encode()).hexdigest()
@@ -1,8 +1,74 @@
+import os
+import re
+import hashlib
+import logging
+import threading
+import sqlite3
+from time import sleep
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, Future, wait
 import jmespath
 from ollama_data_tools import ollama_data_utils as odu
+from ollama_data_tools import ollama_api as oa
 from ollama_data_tools import regex_path_matcher
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterable, Iterator, Union, TYPE_CHECKING
 from ollama_data_tools import json_cache as cm
+from ollama_data_tools import sqlite_cache as sc
+from ollama_data_tools import catalog_history as ch
+from ollama_data_tools import query_cache as qc
+from ollama_data_tools import compact_records as cr
+
+if TYPE_CHECKING:
+    # Imported by the only methods that use them, to keep the startup of
+    # the command line tools fast (`columnar` imports NumPy)
+    from ollama_data_tools import columnar
+    from ollama_data_tools import disk_usage
+
+logger = logging.getLogger(__name__)
+
+LOCAL_HOST = 'local'
+
+STORES = ['json', 'sqlite']
+
+def select_model(models: List[Dict[str, Any]], name: str) -> Dict[str, Any]:
+    """
+    Select a model by name (starts with the name and returns the most
+    specific model). The total order is given by:
+
+    1. The model with the shortest name that starts with the given name.
+    2. If there are multiple models with the same length, we return the first one.
+    3. If a model is named `<model_name>:latest`, we compute its length
+       without the `:latest` suffix unless `name` is `<model_name>:latest`.
+
+    :param models: The models whose name starts with `name`.
+    :param name: The name of the model.
+    :return: A dictionary representing the model.
+    """
+    if not models:
+        raise ValueError(f"No model with name '{name}' found")
+
+    def _len(m):
+        if 'name' not in m:
+            return int(1e9)
+        l = len(m['name'])
+        if m['name'].endswith(':latest'):
+            l -= len(':latest')
+        return l
+    return min(models, key=_len)
+
+def get_host_key(host: str) -> str:
+    """
+    Get the key of a host in the names of its cache files: the host with
+    its non-alphanumeric characters replaced, for readability, followed by
+    a hash of the host, which keeps the keys of distinct hosts distinct,
+    e.g., `http_node_1_11434_7230f3a2` for `http://node-1:11434`.
+
+    :param host: The normalized host.
+    :return: The key.
+    """
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', host).strip('_')
+    return f"{slug}_{hashlib.sha256(host.encode()).hexdigest()[:8]}"
 
 class OllamaData:
     @staticmethod
@@ -16,15 +82,79 @@ class OllamaData:
 
     def __init__(self,
                  cache_path: str = '~/.ollama_data/cache',
-                 cache_time: str = '1 day'):
+                 cache_time: str = '1 day',
+                 hosts: Optional[List[str]] = None,
+                 timeout: float = 10.0,
+                 compact: bool = False,
+                 store: str = 'json',
+                 history: bool = True,
+                 query_cache: bool = False):
         """
         Initialize the OllamaData object.
 
+        By default, the models are those of the local `ollama` binary. If
+        `hosts` is given, the models are instead those of all the hosts,
+        fetched concurrently over the Ollama HTTP API and merged into one
+        catalog, where each model is tagged with its `host`. Duplicate hosts,
+        e.g., `node1` and `node1:11434`, are merged. Each host has its own
+        cache file, `<cache_path>.<key>` (see `get_host_key`). A host that
+        fails or does not respond within `timeout` does not block the others;
+        its expired cache is used if there is one, and the error is recorded
+        in `host_errors`.
+
         :param cache_path: The path to the cache file.
         :param cache_time: The duration the cache is valid.
+        :param hosts: A list of `OLLAMA_HOST`-style endpoints, e.g.,
+                      `node1:11434`. The special host `local` uses the local
+                      `ollama` binary.
+        :param timeout: The time in seconds to wait for the hosts.
+        :param compact: Whether to hold the models in memory as compact
+                        records (see `compact_records.Model`) between calls,
+                        instead of reloading them from the cache on each
+                        call. The dictionary views are built on demand.
+        :param store: How to cache the models, one of `STORES`. `json` keeps
+                      a JSON file per host. `sqlite` keeps all the hosts in
+                      one indexed database, `<cache_path>.sqlite`, which
+                      can also be queried with `sql`.
+        :param history: Whether to record a snapshot of the models each
+                        time they are regenerated, in
+                        `<cache_path>.history.sqlite`. See `get_models_at`
+                        and `get_changes`.
+        :param query_cache: Whether to memoize the results of `search` and
+                            `search_many`, in memory and in
+                            `<cache_path>.queries.sqlite`, until the models
+                            change. See `query_cache.QueryCache`.
         """
+        if store not in STORES:
+            raise ValueError(f"Unknown store: {store}")
 
-        self.cache = cm.JsonCache(cache_path, cache_time)
+        self.store = store
+        # Normalized hosts, without duplicates, in order
+        self.hosts = list(dict.fromkeys(h if h == LOCAL_HOST else oa.normalize_host(h)
+                                        for h in hosts or []))
+        if store == 'sqlite':
+            self.sql_path = os.path.expanduser(f"{cache_path}.sqlite")
+            self.cache = sc.SqliteCache(self.sql_path, cache_time)
+            self.host_caches = {h: sc.SqliteCache(self.sql_path, cache_time, host=h)
+                                for h in self.hosts}
+        else:
+            self.sql_path = None
+            self.cache = cm.JsonCache(cache_path, cache_time)
+            self.host_caches = {
+                h: cm.JsonCache(f"{cache_path}.{get_host_key(h)}", cache_time)
+                for h in self.hosts}
+        self.history = (ch.CatalogHistory(f"{cache_path}.history.sqlite")
+                        if history else None)
+        self.query_cache = (qc.QueryCache(f"{cache_path}.queries.sqlite")
+                            if query_cache else None)
+        self._file_digests = {}
+        self.timeout = timeout
+        self.host_errors = {}
+        self._fetches = {}
+        self._fetches_lock = threading.Lock()
+        self.compact = compact
+        self._records = None
+        self._records_signature = None
 
     def __len__(self) -> int:
         """
@@ -32,7 +162,7 @@ class OllamaData:
 
         :return: The number of models.
         """
-        return len(self.get_models())
+        return len(self.get_records() if self.compact else self.get_models())
 
     def __getitem__(self, index: int) -> Dict[str, Any]:
         """
@@ -41,37 +171,30 @@ class OllamaData:
         :param index: The index of the model.
         :return: A dictionary representing the model.
         """
-        models = self.get_models()
+        models = self.get_records() if self.compact else self.get_models()
         if index < 0 or index >= len(models):
             raise IndexError("Index out of range")
-        return models[index]
+        return models[index].to_dict() if self.compact else models[index]
 
-    def get_model(self, name: str) -> Dict[str, Any]:
+    def get_model(self, name: str, host: Optional[str] = None) -> Dict[str, Any]:
         """
         Get the model by name (starts with the name and returns
-        the most specific model). The total order is given by:
-
-        1. The model with the shortest name that starts with the given name.
-        2. If there are multiple models with the same length, we return the first one.
-        3. If a model is named `<model_name>:latest`, we compute its length
-           without the `:latest` suffix unless `name` is `<model_name>:latest`.
+        the most specific model). See `select_model`.
 
         :param name: The name of the model.
+        :param host: Only consider the models of this host.
         :return: A dictionary representing the model.
         """
-        
-        models = [m for m in self.get_models() if m['name'].startswith(name)]
-        if not models:
-            raise ValueError(f"No model with name '{name}' found")
-        
-        def _len(m):
-            if 'name' not in m:
-                return int(1e9)
-            l = len(m['name'])
-            if m['name'].endswith(':latest'):
-                l -= len(':latest')
-            return l
-        return min(models, key=_len)     
+        if host is not None and host != LOCAL_HOST:
+            host = oa.normalize_host(host)
+        if self.compact:
+            # Only the matching models are converted to dictionaries
+            models = [m.to_dict() for m in self.get_records()
+                      if m.name.startswith(name) and (host is None or m.host == host)]
+        else:
+            models = [m for m in self.get_models() if m['name'].startswith(name)
+                      and (host is None or m.get('host') == host)]
+        return select_model(models, name)
 
 
     def get_models(self) -> Dict[str, Any]:
@@ -82,11 +205,333 @@ class OllamaData:
 
         :return: A dictionary representing the models. See `get_schema` for the schema.
         """
+        if self.compact:
+            return cr.to_dicts(self.get_records())
+        return self._load_models()
+
+    def get_records(self) -> List[cr.Model]:
+        """
+        Get the models as compact records, which are held in memory until the
+        cache expires or changes.
+
+        :return: A list of compact records. See `compact_records.Model`.
+        """
+        signature = self._cache_signature()
+        if self._records is None or signature is None or signature != self._records_signature:
+            self._records = cr.from_dicts(self._load_models())
+            self._records_signature = self._cache_signature()
+        return self._records
+
+    def _cache_signature(self) -> Optional[tuple]:
+        """
+        Get a signature of the cache files, which changes whenever one of them
+        is rewritten.
+
+        :return: A tuple of the modification times of the cache files, or None
+                 if one of them is invalid.
+        """
+        caches = [self.host_caches[h] for h in self.hosts] or [self.cache]
+        if not all(c.is_valid() for c in caches):
+            return None
+        try:
+            return tuple(os.stat(c.path).st_mtime_ns for c in caches)
+        except OSError:
+            return None
+
+    def _load_models(self) -> List[Dict[str, Any]]:
+        """
+        Load the models from the cache, regenerating them if it has expired.
+
+        :return: A list of dictionaries representing the models.
+        """
+        if self.hosts:
+            return self._get_host_models()
+
         if not self.cache.is_valid():
-            self.cache.save(odu.get_models())
+            self._regenerate()
 
         return self.cache.load()
 
+    def _regenerate(self) -> None:
+        """
+        Regenerate the models of the local `ollama` binary and save them.
+        """
+        self.save_models(odu.get_models())
+
+    def save_models(self, models: List[Dict[str, Any]], host: Optional[str] = None) -> None:
+        """
+        Save freshly generated models to the cache and record a snapshot of
+        them in the history. A failure to record the snapshot is only logged,
+        and a corrupt history database is removed.
+
+        :param models: The models.
+        :param host: The host of the models, which are tagged with it, or
+                     None if the object was not created with `hosts`.
+        """
+        if host is None:
+            self.cache.save(models)
+        else:
+            for model in models:
+                model['host'] = host
+            self.host_caches[host].save(models)
+        if self.history is not None:
+            # The history is only an audit log, so it must not fail the save
+            try:
+                self.history.record(models, host)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not record the history of the models: {e}")
+                if sc.is_corrupt(e):
+                    logger.warning(f"Removing corrupt database {self.history.path}")
+                    self.history.clear()
+        if self.query_cache is not None:
+            self.query_cache.invalidate()
+
+    def refresh(self, hosts: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Regenerate the models now, even if the cache has not expired.
+
+        :param hosts: The hosts to refetch, or None for all of them. Only
+                      used if the object was created with `hosts`.
+        :return: A list of dictionaries representing the models.
+        :raises ValueError: If a host is not one of the hosts of the object.
+        """
+        if self.hosts:
+            self._get_host_models(refresh=self.resolve_hosts(hosts) if hosts else self.hosts)
+        else:
+            self._regenerate()
+        return self.get_models()
+
+    def resolve_hosts(self, hosts: Iterable[str]) -> List[str]:
+        """
+        Normalize host names as in `__init__`, e.g., `node1` to
+        `http://node1:11434`, and check that they are hosts of the object.
+
+        :param hosts: The host names.
+        :return: The normalized host names.
+        :raises ValueError: If a host is not one of the hosts of the object.
+        """
+        resolved = [h if h == LOCAL_HOST else oa.normalize_host(h) for h in hosts]
+        unknown = [h for h in resolved if h not in self.hosts]
+        if unknown:
+            raise ValueError(f"Unknown hosts: {', '.join(unknown)}")
+        return resolved
+
+    def watch(self,
+              query: Optional[str] = None,
+              interval: float = 2.0) -> Iterator[Dict[str, Any]]:
+        """
+        Watch the models and yield an event for each model that is added,
+        removed or changed. Each event looks like:
+
+            {'event': 'added' | 'removed' | 'changed',
+             'name': <name>, 'host': <host>, 'time': <ISO date>,
+             'model': <the model record, or the query applied to it>}
+
+        The store is polled every `interval` seconds with a cheap fingerprint:
+        the modification times of the manifest files for the local store
+        (or the names and IDs of `ollama list` if the manifests are not
+        accessible), and the digests reported by `/api/tags` for other hosts.
+        Only when a fingerprint changes are the models of that host
+        regenerated and compared with the previous ones. A model counts as
+        changed if anything but its `age` and `last_modified` changed.
+
+        :param query: A JMESPath query applied to each model record of an
+                      event, e.g., `{name: name, size: total_weights_size}`.
+        :param interval: The time in seconds between polls.
+        :return: An iterator over the events. It never ends on its own.
+        """
+        expression = jmespath.compile(query) if query else None
+        models = self.get_models()
+        previous = {(m.get('host'), m['name']): m for m in models}
+
+        local = [m for m in models if m.get('host') in (None, LOCAL_HOST) and m['weights']]
+        models_dir = (Path(local[0]['weights'][0]['dir']).parent
+                      if local else odu.get_models_dir())
+        signatures = self._store_signatures(models_dir)
+
+        def _event(kind, key, model, now):
+            return {'event': kind, 'name': key[1], 'host': key[0], 'time': now,
+                    'model': expression.search(model) if expression else model}
+
+        def _stable(model):
+            return {k: v for k, v in model.items() if k not in ('age', 'last_modified')}
+
+        while True:
+            sleep(interval)
+            current_signatures = self._store_signatures(models_dir)
+            changed = [h for h in current_signatures
+                       if current_signatures[h] != signatures.get(h)]
+            signatures = current_signatures
+            if not changed:
+                continue
+
+            logger.debug(f"Store changed on hosts {changed}")
+            current = {(m.get('host'), m['name']): m
+                       for m in self.refresh([h for h in changed if h is not None])}
+            now = datetime.now().isoformat()
+            for key in current.keys() - previous.keys():
+                yield _event('added', key, current[key], now)
+            for key in previous.keys() - current.keys():
+                yield _event('removed', key, previous[key], now)
+            for key in current.keys() & previous.keys():
+                if _stable(current[key]) != _stable(previous[key]):
+                    yield _event('changed', key, current[key], now)
+            previous = current
+
+    def _store_signatures(self, models_dir: Path) -> Dict[Optional[str], Any]:
+        """
+        Get a cheap fingerprint of the model store of each host.
+
+        :param models_dir: The directory where the local Ollama stores its models.
+        :return: A dictionary mapping each host (None if the object was not
+                 created with `hosts`) to its fingerprint, or to an error
+                 message if the host could not be reached.
+        """
+        def _signature(host):
+            try:
+                if host in (None, LOCAL_HOST):
+                    return (odu.get_store_fingerprint(models_dir)
+                            or odu.get_list_fingerprint())
+                return oa.get_tags_fingerprint(host, timeout=self.timeout)
+            except RuntimeError as e:
+                return f"error: {e}"
+
+        hosts = self.hosts or [None]
+        with ThreadPoolExecutor(max_workers=len(hosts)) as executor:
+            return dict(zip(hosts, executor.map(_signature, hosts)))
+
+    def _fetch_host_models(self, host: str) -> List[Dict[str, Any]]:
+        """
+        Fetch the models of a host and save them to the cache of the host.
+
+        :param host: The host.
+        :return: The models of the host.
+        """
+        if host == LOCAL_HOST:
+            models = odu.get_models()
+        else:
+            models = oa.get_models(host, timeout=self.timeout)
+        self.save_models(models, host)
+        return models
+
+    def _start_fetch(self, host: str) -> Future:
+        """
+        Start fetching the models of a host in a daemon thread, or join the
+        fetch of the host that is already in flight, e.g., one that outlived
+        the deadline of an earlier call.
+
+        :param host: The host.
+        :return: A future of the models of the host.
+        """
+        with self._fetches_lock:
+            future = self._fetches.get(host)
+            if future is not None:
+                return future
+            future = self._fetches[host] = Future()
+
+        def _fetch():
+            try:
+                models = self._fetch_host_models(host)
+            except Exception as e:
+                error = e
+            else:
+                error = None
+            with self._fetches_lock:
+                del self._fetches[host]
+            if error is None:
+                future.set_result(models)
+            else:
+                future.set_exception(error)
+
+        threading.Thread(target=_fetch, daemon=True).start()
+        return future
+
+    def _load_host_cache(self, host: str) -> List[Dict[str, Any]]:
+        """
+        Load the models of a host from its cache, even if it has expired. A
+        cache that cannot be read is recorded in `host_errors`, and a corrupt
+        one is cleared so that the host is fetched again.
+
+        :param host: The host.
+        :return: The models of the host, or an empty list.
+        """
+        cache = self.host_caches[host]
+        try:
+            return cache.load(allow_expired=True)
+        except RuntimeError:
+            # There is no cache: the host never succeeded, and its fetch
+            # error, if any, is already recorded
+            self.host_errors.setdefault(host, "no cached models")
+        except (OSError, ValueError, sqlite3.DatabaseError) as e:
+            self.host_errors[host] = f"cache could not be loaded: {e}"
+            logger.warning(f"Host {host} failed: {self.host_errors[host]}")
+            if isinstance(e, ValueError) or sc.is_corrupt(e):
+                cache.clear()
+        return []
+
+    def _fetch_stale_hosts(self, refresh: Iterable[str] = ()) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetch the hosts whose cache has expired concurrently, each in a daemon
+        thread, so that a host that hangs neither delays the result by more
+        than `timeout` nor keeps the process alive. A host whose fetch is
+        still in flight from an earlier call is not fetched again; the fetch
+        in flight is awaited instead. A host that fails or times out is
+        recorded in `host_errors`.
+
+        :param refresh: Hosts to fetch even if their cache has not expired.
+        :return: The models of the hosts that were fetched, by host.
+        """
+        stale = [h for h in self.hosts
+                 if h in refresh or not self.host_caches[h].is_valid()]
+        futures = {h: self._start_fetch(h) for h in stale}
+        wait(futures.values(), timeout=self.timeout)
+
+        fetched = {}
+        for host, future in futures.items():
+            if not future.done():
+                self.host_errors[host] = f"timed out after {self.timeout} seconds"
+            elif future.exception() is not None:
+                self.host_errors[host] = str(future.exception())
+            else:
+                fetched[host] = future.result()
+                self.host_errors.pop(host, None)
+                continue
+            logger.warning(f"Host {host} failed: {self.host_errors[host]}")
+        return fetched
+
+    def _get_host_models(self, refresh: Iterable[str] = ()) -> List[Dict[str, Any]]:
+        """
+        Get the models of all the hosts, fetching those whose cache has
+        expired. See `_fetch_stale_hosts`.
+
+        :param refresh: Hosts to fetch even if their cache has not expired.
+        :return: The models of all the hosts, in the order of the hosts.
+        """
+        fetched = self._fetch_stale_hosts(refresh)
+        models = []
+        for host in self.hosts:
+            if host in fetched:
+                models.extend(fetched[host])
+            else:
+                models.extend(self._load_host_cache(host))
+        return models
+
+    def _load_cached_models(self) -> List[Dict[str, Any]]:
+        """
+        Load the models from the caches as they are, without regenerating
+        any, e.g., after `_ensure_fresh`. The expired cache of a host that
+        failed is used. See `_load_host_cache`.
+
+        :return: A list of dictionaries representing the models.
+        """
+        if not self.hosts:
+            return self.cache.load()
+
+        models = []
+        for host in self.hosts:
+            models.extend(self._load_host_cache(host))
+        return models
+
     def search(self,
                query: str = '[*]',
                regex: Optional[str] = None,
@@ -101,7 +546,175 @@ class OllamaData:
                            `utils.regex_path_matcher` for more information.
         :return: JSON (dict) object representing some view of the models.
         """
+        if self.query_cache is not None:
+            return next(self.search_many([{'query': query, 'regex': regex,
+                                           'regex_path': regex_path}]))
+
         output = jmespath.search(query, self.get_models())
         if regex:
             output = regex_path_matcher.regex_path_matcher(output, regex, regex_path)
         return output
+
+    def search_many(self,
+                    queries: Iterable[Dict[str, Any]],
+                    return_exceptions: bool = False) -> Iterator[Any]:
+        """
+        Evaluate many searches against a single load of the models. Each
+        search is a dictionary with the arguments of `search`, i.e., `query`,
+        `regex` and `regex_path`. The JMESPath queries and regex patterns are
+        compiled once, even if several searches repeat them.
+
+        :param queries: The searches to evaluate.
+        :param return_exceptions: Whether a search that fails yields its
+                                  exception instead of raising it.
+        :return: An iterator over the results, in the order of the searches.
+        """
+        if self.query_cache is not None:
+            self._ensure_fresh()
+            fingerprint = self.catalog_fingerprint()
+            models = None
+        else:
+            models = self.get_models()
+        compiled = {}
+
+        def _compile(expr, compile_fn):
+            if (compile_fn, expr) not in compiled:
+                compiled[compile_fn, expr] = compile_fn(expr)
+            return compiled[compile_fn, expr]
+
+        for q in queries:
+            try:
+                if self.query_cache is not None:
+                    key = qc.make_key(fingerprint, q.get('query') or '[*]',
+                                      q.get('regex'), q.get('regex_path') or '@')
+                    hit, output = self.query_cache.get(key)
+                    if hit:
+                        yield output
+                        continue
+                    if models is None:
+                        # The caches are fresh, or their hosts just failed:
+                        # get_models would wait on the failed hosts again
+                        models = self._load_cached_models()
+
+                output = _compile(q.get('query') or '[*]', jmespath.compile).search(models)
+                if q.get('regex'):
+                    output = regex_path_matcher.regex_path_matcher(
+                        output,
+                        _compile(q['regex'], re.compile),
+                        _compile(q.get('regex_path') or '@', jmespath.compile))
+                if self.query_cache is not None:
+                    self.query_cache.put(key, fingerprint, output)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                output = e
+            yield output
+
+    def sql(self, query: str, params: Iterable[Any] = ()) -> List[Dict[str, Any]]:
+        """
+        Run a read-only SQL query against the indexed tables of the models,
+        e.g., to look up models by blob hash or to aggregate sizes by host,
+        without loading the models into memory. The models are regenerated
+        first if the cache has expired. See `sqlite_cache.query` for the
+        tables.
+
+        Only available if the object was created with `store='sqlite'`.
+
+        :param query: The SQL query.
+        :param params: The parameters of the query, for its `?` placeholders.
+        :return: The rows as dictionaries.
+        """
+        if self.store != 'sqlite':
+            raise RuntimeError("SQL queries need store='sqlite'.")
+
+        self._ensure_fresh()
+        return list(sc.query(self.sql_path, query, tuple(params)))
+
+    def _ensure_fresh(self) -> None:
+        """
+        Regenerate the models whose cache has expired, without loading the
+        others.
+        """
+        if self.hosts:
+            self._fetch_stale_hosts()
+        elif not self.cache.is_valid():
+            self._regenerate()
+
+    def catalog_fingerprint(self) -> str:
+        """
+        Get a fingerprint of the content of the caches of the models, which
+        changes whenever the models are regenerated. Each cache file is
+        hashed once per change of its modification time and size.
+
+        :return: The fingerprint.
+        """
+        caches = [self.host_caches[h] for h in self.hosts] or [self.cache]
+        fingerprint = hashlib.sha256(repr(self.hosts).encode())
+        for path in sorted({c.path for c in caches}):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                fingerprint.update(b'\0')
+                continue
+            key = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            cached = self._file_digests.get(path)
+            if cached is None or cached[0] != key:
+                digest = hashlib.sha256()
+                with open(path, 'rb') as file:
+                    for chunk in iter(lambda: file.read(2**20), b''):
+                        digest.update(chunk)
+                cached = self._file_digests[path] = (key, digest.hexdigest())
+            fingerprint.update(cached[1].encode())
+        return fingerprint.hexdigest()
+
+    def get_models_at(self, time: Union[str, float, datetime]) -> List[Dict[str, Any]]:
+        """
+        Reconstruct the models as of a point in time from the history, e.g.,
+        `get_models_at('2 days')` or `get_models_at('2024-05-01T10:00')`.
+
+        The records are those of the snapshots that first saw each version
+        of a model, so their `age` is relative to that snapshot.
+
+        :param time: A POSIX timestamp, a `datetime`, an ISO date or a
+                     duration ago. See `catalog_history.parse_time`.
+        :return: A list of dictionaries representing the models.
+        """
+        if self.history is None:
+            raise RuntimeError("The history is disabled.")
+        return self.history.models_at(time, self.hosts or [None])
+
+    def get_changes(self,
+                    since: Union[str, float, datetime],
+                    until: Union[str, float, datetime, None] = None) -> List[Dict[str, Any]]:
+        """
+        List the models that were added, removed or changed digest between
+        two points in time, according to the history. See
+        `catalog_history.CatalogHistory.changes`.
+
+        :param since: The start of the interval (exclusive), e.g., '1 week'.
+        :param until: The end of the interval (inclusive), or None for now.
+        :return: A list of changes, in order of time.
+        """
+        if self.history is None:
+            raise RuntimeError("The history is disabled.")
+        return self.history.changes(since, until, self.hosts or [None])
+
+    def columns(self) -> 'columnar.ModelColumns':
+        """
+        Get a columnar view of the models for aggregate queries, e.g.,
+        sums, group-bys, top-k and histograms. See `columnar.ModelColumns`.
+
+        :return: The columnar view of the models.
+        """
+        from ollama_data_tools import columnar
+        return columnar.ModelColumns.from_records(self.get_models())
+
+    def disk_usage(self) -> 'disk_usage.DiskUsage':
+        """
+        Get the deduplicated disk usage of the models, where blobs shared by
+        several models are counted once. See `disk_usage.DiskUsage`.
+
+        :return: The disk usage of the models.
+        """
+        from ollama_data_tools import disk_usage
+        return disk_usage.DiskUsage(self.get_models())
@@ -1,32 +1,150 @@
 #!/usr/bin/env python3
 
 import re
+import os
+import signal
 from ollama_data_tools import ollama_data as od
+from ollama_data_tools import page_cache as pc
+from ollama_data_tools import conversion_tools as ct
 import subprocess
 import argparse
 from typing import Dict, Any, List
 import sys
 import logging
 
-def run(args: List[str]) -> str:
+LAUNCH_MODES = ['passthrough', 'stream', 'exec']
+
+def run(args: List[str], mode: str = 'passthrough') -> None:
     """
-    Runs the given subprocess with the specified arguments.
+    Runs the given engine with the specified arguments.
+
+    The launch modes are:
+
+        - `passthrough`: The engine inherits the stdin, stdout and stderr of
+          this process, so it writes to the terminal directly.
+        - `stream`: The engine's stdout is read through a pipe and copied to
+          our stdout as raw bytes, without decoding it; stderr is inherited.
+        - `exec`: This process is replaced by the engine (`os.execvp`), so
+          Python is not involved at all once the engine starts.
+
+    While the engine runs, SIGINT (Ctrl-C) is left to the engine, e.g., to
+    interrupt its generation, instead of killing this process.
 
     Args:
         args (List[str]): The arguments to pass to the subprocess.
+        mode (str): The launch mode, one of `LAUNCH_MODES`.
 
-    Returns:
-        str: The output from the subprocess.
+    Raises:
+        RuntimeError: If the engine exits with a non-zero status.
     """
-    process = subprocess.Popen(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    for line in iter(process.stdout.readline, b''):
-        print(line.decode(), end='')
+    if mode not in LAUNCH_MODES:
+        raise ValueError(f"Unknown launch mode: {mode}")
 
-    process.stdout.close()
-    process.wait()
+    if mode == 'exec':
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os.execvp(args[0], args)
+
+    # A handler (unlike SIG_IGN) is reset to the default in the engine
+    handler = signal.signal(signal.SIGINT, lambda signum, frame: None)
+    try:
+        if mode == 'passthrough':
+            process = subprocess.Popen(args)
+        else:
+            process = subprocess.Popen(args, stdout=subprocess.PIPE, bufsize=0)
+            fd = process.stdout.fileno()
+            out = sys.stdout.buffer
+            for chunk in iter(lambda: os.read(fd, 65536), b''):
+                out.write(chunk)
+                out.flush()
+            process.stdout.close()
+        process.wait()
+    finally:
+        signal.signal(signal.SIGINT, handler)
 
     if process.returncode != 0:
-        raise RuntimeError(f"Error: {process.stderr.read().decode()}")
+        raise RuntimeError(f"Engine exited with status {process.returncode}.")
+
+def _llamacpp_args(options: Dict[str, Any]) -> List[str]:
+    """
+    Returns the arguments compatible with the llamacpp engine.
+
+    Args:
+        options (Dict[str, Any]): The options to use.
+
+    Returns:
+        List[str]: The arguments for the llamacpp engine.
+    """
+
+    if not options.get('engine_path'):
+        raise ValueError("Engine path is required.")
+    
+    args = [
+        options['engine_path'],
+        '--model',
+        options['model_path'],
+        '--instruct'
+    ]
+
+    args.extend(_split_engine_args(options['engine_args']))
+    return args
+
+def _llamacpp_server_args(options: Dict[str, Any]) -> List[str]:
+    """
+    Returns the arguments of the llamacpp server (`llama-server`) that serves
+    the model over HTTP on a local port.
+
+    Args:
+        options (Dict[str, Any]): The options to use, including the `port`.
+
+    Returns:
+        List[str]: The arguments for the llamacpp server.
+    """
+
+    if not options.get('engine_path'):
+        raise ValueError("Engine path is required.")
+
+    args = [
+        options['engine_path'],
+        '--model',
+        options['model_path'],
+        '--host',
+        '127.0.0.1',
+        '--port',
+        str(options['port'])
+    ]
+    args.extend(_split_engine_args(options['engine_args']))
+    return args
+
+def _split_engine_args(engine_args: List[str]) -> List[str]:
+    """
+    Splits the pass-through engine arguments, e.g., `--temp 0.5` or
+    `--prompt "[INST] ... [/INST]"`, into command line arguments.
+
+    Args:
+        engine_args (List[str]): The pass-through engine arguments.
+
+    Returns:
+        List[str]: The command line arguments.
+    """
+    args = []
+    for arg in engine_args or []:
+        match = re.match(r'--\w+ ["\'].*["\']', arg)
+        if match:
+            key, value = arg.split(' ', 1)
+            value = value.strip('\'"')
+            args.extend([key, value])
+        else:
+            args.extend(arg.split())
+    return args
+
+engines = {
+    'llamacpp': _llamacpp_args
+}
+
+server_engines = {
+    'llamacpp': _llamacpp_server_args
+}
 
 def main():
     logging.basicConfig(level=logging.INFO)
@@ -47,6 +165,15 @@ def main():
     parser.add_argument('--engine-args', help='Arguments to pass through to the engine.', nargs='*', default=[], type=str)
     parser.add_argument('--debug', help='Print debug information.', action='store_true')
     parser.add_argument('--show-template', help='Show the template for the model.', action='store_true')
+    parser.add_argument('--prewarm', help='Pull the weights into the page cache before launching the engine.', action='store_true')
+    parser.add_argument('--prewarm-background', help='Pull the weights into the page cache while the engine starts.', action='store_true')
+    parser.add_argument('--prewarm-method', help='How to prewarm the weights.', choices=pc.PREWARM_METHODS, default='read')
+    parser.add_argument('--launch-mode', help='How to launch the engine: "passthrough" connects its stdio to the terminal,\n"stream" copies its stdout as raw bytes, "exec" replaces this process with it.', choices=LAUNCH_MODES, default='passthrough')
+    parser.add_argument('--serve', help='Serve the models over HTTP from a pool of warm engine processes (e.g.,\nllama-server as --engine-path). Requests name their model in a JSON "model" field.', action='store_true')
+    parser.add_argument('--serve-host', help='The address to serve on.', type=str, default='127.0.0.1')
+    parser.add_argument('--serve-port', help='The port to serve on.', type=int, default=8080)
+    parser.add_argument('--pool-size', help='The maximum number of warm engines.', type=int, default=2)
+    parser.add_argument('--pool-memory', help='The maximum total size in GB of the weights of the warm engines.', type=float)
     args = parser.parse_args()
 
     models = od.OllamaData(cache_path=args.cache_path, cache_time=args.cache_time)
@@ -54,43 +181,6 @@ def main():
     if args.debug:
         logger.setLevel(logging.DEBUG)
 
-    def _llamacpp_args(options: Dict[str, Any]) -> List[str]:
-        """
-        Returns the arguments compatible with the llamacpp engine.
-
-        Args:
-            options (Dict[str, Any]): The options to use.
-
-        Returns:
-            List[str]: The arguments for the llamacpp engine.
-        """
-
-        if 'engine_path' not in options:
-            raise ValueError("Engine path is required.")
-        
-        args = [
-            options['engine_path'],
-            '--model',
-            options['model_path'],
-            '--instruct'
-        ]
-
-        if options['engine_args']:
-            for arg in options['engine_args']:
-                match = re.match(r'--\w+ ["\'].*["\']', arg)
-                if match:
-                    key, value = arg.split(' ', 1)
-                    value = value.strip('\'"')
-                    args.extend([key, value])
-                else:
-                    args.extend(arg.split())
-
-        return args
-
-    engines = {
-        'llamacpp': _llamacpp_args
-    }
-
     if args.list_engines:
         print("Available engines:")
         for engine in engines.keys():
@@ -104,6 +194,34 @@ def main():
             print(f"  - {model}")
         exit(0)
 
+    if args.serve:
+        if not args.engine_path:
+            print("Error: Engine path is required.")
+            exit(1)
+
+        def _server_args(model, port):
+            return server_engines[args.engine]({
+                'engine_path': args.engine_path,
+                'model_path': model['weights'][0]['file_path'],
+                'engine_args': args.engine_args,
+                'port': port,
+            })
+
+        # Only the server uses the pool, so it is imported here
+        from ollama_data_tools import engine_pool as ep
+        pool = ep.EnginePool(
+            _server_args,
+            max_engines=args.pool_size,
+            memory_budget=(ct.convert_bytes(args.pool_memory, 'GB', 'B')
+                           if args.pool_memory else None))
+        # Stop the engines on SIGTERM too, not only on Ctrl-C
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            ep.serve(pool, models.get_model, args.serve_host, args.serve_port)
+        except KeyboardInterrupt:
+            pass
+        exit(0)
+
     if not args.model:
         print("Specify a model to run or show the template for.")
         exit(1)
@@ -132,10 +250,19 @@ def main():
     try:
         run_args = engines[args.engine](options)
 
+        weight_paths = [w['file_path'] for w in model['weights']]
+        if args.prewarm_background:
+            pc.prewarm_in_background(weight_paths, method=args.prewarm_method)
+        elif args.prewarm:
+            report = pc.prewarm(weight_paths, method=args.prewarm_method)
+            resident = report['resident_before']
+            logger.info(f"Prewarmed {report['bytes'] / 2**30:.2f} GB in {report['seconds']:.2f} s"
+                        + (f" ({resident:.0%} was already cached)" if resident is not None else ""))
+
         logger.debug(f"Running model '{args.model}' with engine '{args.engine}' using the following engine-args:")
         for arg in run_args:
             logger.debug(" - " + arg)
-        run(run_args)
+        run(run_args, args.launch_mode)
     except Exception as e:
         print(f"Error: {e}")
         exit(1)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import json
+import logging
+import argparse
+from ollama_data_tools import ollama_data as od
+from ollama_data_tools import page_cache as pc
+
+def get_args():
+    """
+    Parse and return command line arguments.
+
+    :return: Parsed command line arguments.
+    """
+    script_name = os.path.basename(sys.argv[0])
+    parser = argparse.ArgumentParser(
+        description='Pull the weights of Ollama models into the page cache.',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=f"""
+Examples:
+
+  Prewarm the weights of a model before running it with another engine:
+
+    ./{script_name} mistral
+
+  Prewarm the weights of the models selected by a JMESPath query:
+
+    ./{script_name} --query '[?total_weights_size < `5`]'
+    ./{script_name} --query "max_by(@, &total_weights_size)"
+
+  Prewarm the weights of all the models:
+
+    ./{script_name} --all
+
+  Only report which fraction of the weights is already in the page cache:
+
+    ./{script_name} --check mistral llama3
+"""
+    )
+
+    parser.add_argument('models',
+                        help='The models to prewarm.',
+                        nargs='*')
+
+    parser.add_argument('--query',
+                        help='A JMESPath query selecting the models to prewarm.',
+                        metavar='QUERY')
+
+    parser.add_argument('--all',
+                        help='Prewarm the weights of all the models.',
+                        action='store_true')
+
+    parser.add_argument('--paths',
+                        help='The files to prewarm, instead of the weights of models.',
+                        metavar='PATH',
+                        nargs='+')
+
+    parser.add_argument('--method',
+                        help='"read" reads the files with parallel sequential reads, "fadvise" asks the kernel to read them ahead.',
+                        choices=pc.PREWARM_METHODS,
+                        default='read')
+
+    parser.add_argument('--workers',
+                        help='The number of parallel readers.',
+                        type=int,
+                        default=4)
+
+    parser.add_argument('--check',
+                        help='Only report the fraction of each file in the page cache.',
+                        action='store_true')
+
+    parser.add_argument('--debug',
+                        help='Set logging level to DEBUG.',
+                        action='store_true')
+
+    parser.add_argument('--cache-time',
+                        help='Time to keep the cache file.',
+                        metavar='STRING',
+                        type=str,
+                        default="1 day")
+
+    parser.add_argument('--cache-path',
+                        help='The path to the cache file.',
+                        metavar='PATH',
+                        default='~/.ollama_data/cache')
+
+    args = parser.parse_args()
+    if not (args.models or args.query or args.all or args.paths):
+        parser.error('select the models to prewarm with MODELS, --query or --all, or the files with --paths')
+    return args
+
+def main():
+    """
+    Main function to execute the script.
+    """
+    args = get_args()
+
+    logging.basicConfig(level=logging.DEBUG if args.debug else logging.INFO)
+    logger = logging.getLogger(__name__)
+    logger.debug(f"Arguments received: {args}")
+
+    paths = args.paths or []
+    if not paths:
+        data = od.OllamaData(cache_path=args.cache_path,
+                             cache_time=args.cache_time)
+        try:
+            models = [data.get_model(name) for name in args.models]
+        except ValueError as e:
+            logger.error(str(e))
+            sys.exit(1)
+        if args.query or args.all:
+            selected = data.search(args.query or '[*]')
+            if isinstance(selected, dict):
+                selected = [selected]
+            if not isinstance(selected, list) or not all(
+                    isinstance(m, dict) and 'weights' in m for m in selected):
+                logger.error(f"The query must select model records, e.g., "
+                             f"\"[?name=='mistral:latest']\", not: {json.dumps(selected)[:200]}")
+                sys.exit(1)
+            models += selected
+        for model in models:
+            paths.extend(w['file_path'] for w in model.get('weights', []))
+        paths = list(dict.fromkeys(paths))
+
+    missing = [p for p in paths if not os.path.isfile(p)]
+    for path in missing:
+        logger.warning(f"Skipping {path}: not a local file")
+    paths = [p for p in paths if p not in missing]
+
+    if args.check:
+        output = [{'file_path': p, 'resident': pc.resident_fraction(p)} for p in paths]
+    else:
+        output = pc.prewarm(paths, method=args.method, workers=args.workers)
+        logger.info(f"Prewarmed {output['bytes'] / 2**30:.2f} GB in {output['seconds']:.2f} s")
+
+    print(json.dumps(output, indent=4))
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,14 @@ import argparse
 import os
 import sys
 import json
+import sqlite3
+from typing import Dict, Any, List
+import jmespath
 from ollama_data_tools import ollama_data as od
+from ollama_data_tools import ollama_api as oa
+from ollama_data_tools import regex_path_matcher
+
+BATCH_FORMATS = ['lines', 'json']
 
 def get_args():
     """
@@ -35,6 +42,48 @@ Examples:
   Using regex and regex-path with a piped query:
 
     echo "[*].{{info: {{ name: name, other: weights}}}}" | ./{script_name} --regex 14f2 --regex-path "info.other[*].file_name"
+
+  Show the disk usage of the models, with blobs shared by several models
+  counted once, or the bytes that removing some models would free:
+
+    ./{script_name} --disk-usage
+    ./{script_name} --reclaim mistral,llama3
+
+  Query the models of several Ollama hosts at once. Each model is tagged with
+  its host:
+
+    ./{script_name} --hosts node1,node2:11434 "[?host=='http://node1:11434'].name"
+
+  Evaluate many queries against a single load of the models, one query (or
+  {{"query", "regex", "regex_path"}} object) per line, or a JSON array of
+  them, and print one JSON result per line, in order:
+
+    printf '%s\\n' "[*].name" "length(@)" | ./{script_name} --batch
+    ./{script_name} --batch queries.txt
+    ./{script_name} --batch queries.json --batch-format json
+
+  Memoize the results of repeated queries until the models change:
+
+    ./{script_name} --query-cache "max_by(@, &total_weights_size).name"
+
+  Watch the models and print one JSON event per line for each model that is
+  added, removed or changed. The query, if any, is applied to each model:
+
+    ./{script_name} --watch "{{name: name, size: total_weights_size}}"
+
+  Cache the models in an indexed SQLite database and query it with SQL,
+  e.g., the total size of the models of each host, or the models that
+  share a blob. The JMESPath query, if any, is applied to the rows:
+
+    ./{script_name} --sql "SELECT host, count(*) AS n, sum(total_bytes) AS bytes FROM models GROUP BY host"
+    ./{script_name} --sql "SELECT m.name FROM blobs b JOIN models m ON m.id = b.model_id WHERE b.hash LIKE '14f2%'" "[*].name"
+
+  Each refresh records a snapshot of the models. Query the models as they
+  were at some point in time, or list what changed since then:
+
+    ./{script_name} --at "2 days" "[*].name"
+    ./{script_name} --changes "1 week"
+    ./{script_name} --changes 2024-05-01 --until 2024-05-08 "[?event=='removed'].name"
 """
     )
 
@@ -51,6 +100,60 @@ Examples:
                         metavar='QUERY',
                         default='@')
 
+    parser.add_argument('--batch',
+                        help='Read queries from FILE (or stdin), in the format given by --batch-format, and print the results as NDJSON.',
+                        metavar='FILE',
+                        nargs='?',
+                        const='-')
+
+    parser.add_argument('--batch-format',
+                        help='The format of the --batch queries: one query (or {"query", "regex", "regex_path"} object) per line, or a JSON array of them.',
+                        choices=BATCH_FORMATS,
+                        default='lines')
+
+    parser.add_argument('--watch',
+                        help='Watch the models and print an NDJSON event for each model that is added, removed or changed. The query is applied to each model.',
+                        action='store_true')
+
+    parser.add_argument('--interval',
+                        help='Time in seconds between checks for changes with --watch.',
+                        metavar='SECONDS',
+                        type=float,
+                        default=2.0)
+
+    parser.add_argument('--sql',
+                        help='Run a read-only SQL query against the indexed SQLite cache of the models (implies --store sqlite). The JMESPath query is applied to the rows.',
+                        metavar='SQL')
+
+    parser.add_argument('--store',
+                        help='How to cache the models: a JSON file per host, or one indexed SQLite database.',
+                        choices=od.STORES,
+                        default='json')
+
+    parser.add_argument('--at',
+                        help='Query the models as they were at TIME, an ISO date or a duration ago, e.g., "2 days".',
+                        metavar='TIME')
+
+    parser.add_argument('--changes',
+                        help='List the models added, removed or changed since TIME, an ISO date or a duration ago. The query is applied to the list.',
+                        metavar='TIME')
+
+    parser.add_argument('--until',
+                        help='The end of the interval of --changes (default: now).',
+                        metavar='TIME')
+
+    parser.add_argument('--query-cache',
+                        help='Memoize the results of queries, in memory and on disk, until the models change.',
+                        action='store_true')
+
+    parser.add_argument('--disk-usage',
+                        help='Print the deduplicated disk usage of the models.',
+                        action='store_true')
+
+    parser.add_argument('--reclaim',
+                        help='Comma-separated list of models, NAME[:TAG] or NAME[:TAG]@HOST (the tag defaults to latest). Print the bytes that removing them would free.',
+                        metavar='MODELS')
+
     parser.add_argument('--debug', 
                         help='Set logging level to DEBUG.',
                         action='store_true')
@@ -66,6 +169,16 @@ Examples:
                         type=str, 
                         default="1 hour")
 
+    parser.add_argument('--hosts',
+                        help='Comma-separated list of Ollama hosts to query, e.g., "node1,node2:11434". The host "local" uses the local ollama binary.',
+                        metavar='HOSTS')
+
+    parser.add_argument('--timeout',
+                        help='Time in seconds to wait for the hosts.',
+                        metavar='SECONDS',
+                        type=float,
+                        default=10.0)
+
     parser.add_argument('--cache-path',
                         help='The path to the cache file.',
                         metavar='PATH',
@@ -73,6 +186,51 @@ Examples:
 
     return parser.parse_args()
 
+def read_batch(text: str,
+               regex: str = None,
+               regex_path: str = '@',
+               format: str = 'lines') -> List[Dict[str, Any]]:
+    """
+    Parse the queries of a batch, in one of `BATCH_FORMATS`. With `lines`,
+    each line is a JMESPath query or a `{query, regex, regex_path}` JSON
+    object; a line that is a JSON array, e.g., `[]`, is a JMESPath query.
+    With `json`, the batch is a JSON array of queries or such objects.
+    Plain queries use the given `regex` and `regex_path`.
+
+    :param text: The batch.
+    :param regex: The default regex pattern.
+    :param regex_path: The default JMESPath query for the regex pattern.
+    :param format: The format of the batch.
+    :return: A list of `{query, regex, regex_path}` dictionaries.
+    :raises ValueError: If a `json` batch is not a JSON array of queries.
+    """
+    def _parse(line):
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    if format == 'json':
+        batch = _parse(text)
+        if not (isinstance(batch, list) and all(isinstance(q, (str, dict)) for q in batch)):
+            raise ValueError("Expected a JSON array of queries or objects.")
+        return [q if isinstance(q, dict) else
+                {'query': q, 'regex': regex, 'regex_path': regex_path}
+                for q in batch]
+    if format != 'lines':
+        raise ValueError(f"Unknown batch format: {format}")
+
+    queries = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        query = _parse(line) if line.startswith('{') else None
+        if not isinstance(query, dict):
+            query = {'query': line, 'regex': regex, 'regex_path': regex_path}
+        queries.append(query)
+    return queries
+
 def main():
     """
     Main function to execute the script.
@@ -83,13 +241,17 @@ def main():
     logger = logging.getLogger(__name__)
     logger.debug(f"Arguments received: {args}")
 
-    # If no query is provided as an argument, check if a query is being piped in
+    # If no query is provided as an argument, check if a query is being piped
+    # in. The other modes only take a query as an argument, so that they do
+    # not wait on a stdin that is never closed, e.g., under cron.
     query = args.query
-    if not query and not sys.stdin.isatty():
+    stdin_query = not (args.batch or args.watch or args.sql or args.at or args.changes
+                       or args.disk_usage or args.reclaim)
+    if not query and stdin_query and not sys.stdin.isatty():
         query = sys.stdin.read().strip()
         logger.debug(f"Piped query received: {query}")
 
-    if not query and not args.schema:
+    if not query and not args.schema and not args.watch:
         query = '[*]'
 
     if args.schema:
@@ -97,11 +259,103 @@ def main():
         sys.exit(0)
 
     data = od.OllamaData(cache_path=args.cache_path,
-                         cache_time=args.cache_time)
+                         cache_time=args.cache_time,
+                         hosts=args.hosts.split(',') if args.hosts else None,
+                         timeout=args.timeout,
+                         store='sqlite' if args.sql else args.store,
+                         query_cache=args.query_cache)
+
+    if args.sql:
+        try:
+            rows = data.sql(args.sql)
+        except sqlite3.Error as e:
+            logger.error(f"SQL query failed: {e}")
+            sys.exit(1)
+        output = jmespath.search(query, rows)
+        if args.regex:
+            output = regex_path_matcher.regex_path_matcher(output, args.regex, args.regex_path)
+        print(json.dumps(output, indent=4))
+        sys.exit(0)
+
+    if args.at or args.changes:
+        try:
+            if args.changes:
+                output = data.get_changes(args.changes, args.until)
+            else:
+                output = data.get_models_at(args.at)
+        except (ValueError, sqlite3.Error) as e:
+            logger.error(f"History query failed: {e}")
+            sys.exit(1)
+        output = jmespath.search(query, output)
+        if args.regex:
+            output = regex_path_matcher.regex_path_matcher(output, args.regex, args.regex_path)
+        print(json.dumps(output, indent=4))
+        sys.exit(0)
+
+    if args.disk_usage or args.reclaim:
+        du = data.disk_usage()
+        if args.reclaim:
+            names = []
+            for name in args.reclaim.split(','):
+                name, _, host = name.strip().partition('@')
+                if ':' not in name:
+                    name += ':latest'
+                if host and host != od.LOCAL_HOST:
+                    host = oa.normalize_host(host)
+                names.append(f"{name}@{host}" if host else name)
+            try:
+                output = {'models': names, 'reclaimable_bytes': du.reclaimable_bytes(names)}
+            except ValueError as e:
+                logger.error(e)
+                sys.exit(1)
+        else:
+            output = du.report()
+        print(json.dumps(output, indent=4))
+        sys.exit(0)
+
+    if args.watch:
+        try:
+            for event in data.watch(query=query, interval=args.interval):
+                print(json.dumps(event), flush=True)
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    if args.batch:
+        if args.batch == '-':
+            text = sys.stdin.read()
+        else:
+            try:
+                with open(args.batch, 'r') as file:
+                    text = file.read()
+            except OSError as e:
+                logger.error(f"Cannot read the batch file (use '--batch -' or no "
+                             f"argument to read the queries from stdin): {e}")
+                sys.exit(1)
+        try:
+            queries = read_batch(text, args.regex, args.regex_path, args.batch_format)
+        except ValueError as e:
+            logger.error(f"Cannot read the batch: {e}")
+            sys.exit(1)
+        logger.debug(f"Batch of {len(queries)} queries received")
+
+        failed = False
+        for q, output in zip(queries, data.search_many(queries, return_exceptions=True)):
+            if isinstance(output, Exception):
+                logger.error(f"Query {q.get('query')!r} failed: {output}")
+                output = {'error': str(output)}
+                failed = True
+            print(json.dumps(output), flush=True)
+        if data.query_cache is not None:
+            logger.debug(f"Query cache: {data.query_cache.stats()}")
+        sys.exit(1 if failed else 0)
+
     output = data.search(
         query=query,
         regex=args.regex,
         regex_path=args.regex_path)
+    if data.query_cache is not None:
+        logger.debug(f"Query cache: {data.query_cache.stats()}")
 
     print(json.dumps(output, indent=4))
 
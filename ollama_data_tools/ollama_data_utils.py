@@ -1,8 +1,11 @@
 import subprocess
+import os
+import json
+import hashlib
 from pathlib import Path
 import re
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from ollama_data_tools import conversion_tools as ct
 
 def get_schema() -> List[Dict[str, Any]]:
@@ -13,6 +16,7 @@ def get_schema() -> List[Dict[str, Any]]:
     """
     return [{
         'name': '<str>',
+        'digest': '<str>',
         'model_params': '<dict>',
         'system_message': '<list[str]>',
         'total_weights_size': '<float>',
@@ -36,6 +40,12 @@ def get_schema() -> List[Dict[str, Any]]:
             'file_size_units': '<str>',
             'last_modified': '<str>',
             'metadata_modified': '<str>'
+        }],
+        'host': '<str|None>',
+        'layers': [{
+            'hash': '<str>',
+            'media_type': '<str>',
+            'file_size': '<int>'
         }]
     }]
 
@@ -61,55 +71,190 @@ def get_models(exclude_keys = None) -> List[Dict[str, Any]]:
     
     :return: A list of dictionaries with model information.
     """
-    output = run_ollama(['list'])
+    models = []
+    for parts in parse_model_list(run_ollama(['list'])):
+        model_name = parts[0]
+        models.append(make_model(
+            parts,
+            get_modelfile(model_name),
+            get_model_system(model_name),
+            run_ollama(['show', model_name, '--template']),
+            run_ollama(['show', model_name, '--parameters'])))
+    return models
+
+def parse_model_list(output: str) -> List[List[str]]:
+    """
+    Parses the output of `ollama list` into the columns of each model:
+    name, ID, size, size units and modification time.
+
+    :param output: The output of `ollama list`.
+    :return: A list of columns, one per model.
+    """
     lines = output.splitlines()
     lines = [line for line in lines if line.strip()]
     if lines and lines[0].startswith('NAME'):
         lines.pop(0)
+    return [line.split() for line in lines]
 
-    models = []
-    for line in lines:
-        parts = line.split()
-        model_name = parts[0]
-        #weights_size_gb = convert_bytes(float(parts[2]), parts[3], 'GB')
-        dur, delta = ct.parse_duration(parts[4] + ' ' + parts[5])
-        
-        #weight_info['size_units'] = 'GB'
-
-        weight_infos = []
-        weight_paths = get_weights_path(model_name)
-        for weight_path in weight_paths:
-            weight_info = ct.get_file_info(weight_path)
-            match = re.search(r'.*/sha256-([a-f0-9]{64})',
-                      str(weight_path), re.IGNORECASE)
-            weight_info['hash'] = match.group(1) if match else None
-            weight_info['dir'] = str(weight_path.parent)
-            weight_infos.append(weight_info)
-
-        total_weights_size = sum([info['file_size'] if 'file_size' in info else 0
-                                  for info in weight_infos])        
-        models.append({
-            'name': model_name,
-            'last_modified': (datetime.now() - delta).isoformat(),
-            'age': {
-                "days": dur.days,
-                "seconds": dur.seconds,
-                "years": dur.years,
-                "months": dur.months,
-                "weeks": dur.weeks,
-                "hours": dur.hours,
-                "minutes": dur.minutes,
-            },
-            'model_params': get_model_params(model_name),
-            'system_message': get_model_system(model_name),
-            'template': get_model_template(model_name),
-            'modelfile': get_modelfile(model_name),
-            'total_weights_size': ct.convert_bytes(total_weights_size, 'B', 'GB'),
-            'total_weights_size_units': 'GB',
-            #'total_weights_size_alternate': weights_size_gb,
-            'weights': weight_infos
+def make_model(parts: List[str],
+               modelfile: str,
+               system: str,
+               template: str,
+               parameters: str) -> Dict[str, Any]:
+    """
+    Builds the information about a model from the outputs of `ollama list`
+    and `ollama show`. It stats the weights and reads the manifest of the
+    model, but does not run `ollama`.
+
+    :param parts: The columns of the model in `ollama list`. See `parse_model_list`.
+    :param modelfile: The output of `ollama show --modelfile`.
+    :param system: The output of `ollama show --system`.
+    :param template: The output of `ollama show --template`.
+    :param parameters: The output of `ollama show --parameters`.
+    :return: A dictionary with model information.
+    """
+    model_name = parts[0]
+    #weights_size_gb = convert_bytes(float(parts[2]), parts[3], 'GB')
+    dur, delta = ct.parse_duration(parts[4] + ' ' + parts[5])
+
+    #weight_info['size_units'] = 'GB'
+
+    weight_infos = []
+    weight_paths = parse_weights_path(modelfile)
+    for weight_path in weight_paths:
+        weight_info = ct.get_file_info(weight_path)
+        weight_info['hash'] = parse_weight_hash(weight_path)
+        weight_info['dir'] = str(weight_path.parent)
+        weight_infos.append(weight_info)
+
+    total_weights_size = sum([info['file_size'] if 'file_size' in info else 0
+                              for info in weight_infos])        
+    models_dir = (Path(weight_infos[0]['dir']).parent
+                  if weight_infos else get_models_dir())
+    return {
+        'name': model_name,
+        'digest': parts[1],
+        'last_modified': (datetime.now() - delta).isoformat(),
+        'age': {
+            "days": dur.days,
+            "seconds": dur.seconds,
+            "years": dur.years,
+            "months": dur.months,
+            "weeks": dur.weeks,
+            "hours": dur.hours,
+            "minutes": dur.minutes,
+        },
+        'model_params': parse_model_params(parameters),
+        'system_message': system,
+        'template': parse_model_template(template),
+        'modelfile': modelfile,
+        'total_weights_size': ct.convert_bytes(total_weights_size, 'B', 'GB'),
+        'total_weights_size_units': 'GB',
+        #'total_weights_size_alternate': weights_size_gb,
+        'weights': weight_infos,
+        'layers': get_model_layers(model_name, models_dir)
+    }
+
+def get_models_dir() -> Path:
+    """
+    Returns the directory where Ollama stores its models, i.e., `$OLLAMA_MODELS`
+    or `~/.ollama/models` if it is not set.
+
+    :return: The path of the models directory.
+    """
+    return Path(os.path.expanduser(os.environ.get('OLLAMA_MODELS', '~/.ollama/models')))
+
+def get_store_fingerprint(models_dir: Path) -> Optional[str]:
+    """
+    Returns a fingerprint of the manifests in the models directory, which
+    changes whenever a model is pulled, created, copied or removed. It only
+    stats the manifest files, so it is cheap to poll.
+
+    :param models_dir: The directory where Ollama stores its models.
+    :return: The fingerprint, or None if there is no manifests directory.
+    """
+    manifests = Path(models_dir, 'manifests')
+    if not manifests.is_dir():
+        return None
+
+    fingerprint = hashlib.sha256()
+    for root, dirs, files in os.walk(manifests):
+        dirs.sort()
+        for file in sorted(files):
+            path = os.path.join(root, file)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            fingerprint.update(f"{os.path.relpath(path, manifests)}\0"
+                               f"{stat.st_mtime_ns}\0{stat.st_size}\n".encode())
+    return fingerprint.hexdigest()
+
+def get_list_fingerprint() -> str:
+    """
+    Returns a fingerprint of the names and IDs of the models reported by
+    `ollama list`, for when the manifests directory is not accessible.
+
+    :return: The fingerprint.
+    """
+    lines = [line.split()[:2] for line in run_ollama(['list']).splitlines() if line.strip()]
+    return hashlib.sha256(repr(lines).encode()).hexdigest()
+
+def get_manifest_path(model_name: str, models_dir: Path) -> Path:
+    """
+    Returns the path of the manifest of a model. A model named `mistral` or
+    `mistral:latest` has its manifest at
+    `<models_dir>/manifests/registry.ollama.ai/library/mistral/latest`.
+
+    :param model_name: The name of the model.
+    :param models_dir: The directory where Ollama stores its models.
+    :return: The path of the manifest.
+    """
+    name, _, tag = model_name.partition(':')
+    parts = name.split('/')
+    if len(parts) == 1:
+        parts.insert(0, 'library')
+    if len(parts) == 2:
+        parts.insert(0, 'registry.ollama.ai')
+    return Path(models_dir, 'manifests', *parts, tag or 'latest')
+
+def get_model_layers(model_name: str, models_dir: Path) -> List[Dict[str, Any]]:
+    """
+    Fetches the layers (the weights, template, parameters, license, etc.) of a
+    model from its manifest, including its config blob.
+
+    :param model_name: The name of the model.
+    :param models_dir: The directory where Ollama stores its models.
+    :return: A list of layers, each with its hash, media type and size in
+             bytes, or an empty list if the manifest cannot be read.
+    """
+    try:
+        with open(get_manifest_path(model_name, models_dir), 'r') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return []
+
+    layers = []
+    for layer in [manifest.get('config')] + manifest.get('layers', []):
+        if not layer or 'digest' not in layer:
+            continue
+        layers.append({
+            'hash': layer['digest'].split(':', 1)[-1],
+            'media_type': layer.get('mediaType'),
+            'file_size': layer.get('size', 0)
         })
-    return models
+    return layers
+
+def parse_weight_hash(weight_path: Path) -> Optional[str]:
+    """
+    Parses the SHA256 hash of a weight blob from its path.
+
+    :param weight_path: The path of the weight blob, `.../sha256-<hash>`.
+    :return: The hash, or None if the path is not a blob path.
+    """
+    match = re.search(r'.*/sha256-([a-f0-9]{64})',
+                      str(weight_path), re.IGNORECASE)
+    return match.group(1) if match else None
 
 def get_model_weights_license(model_name: str) -> str:
     """
@@ -147,7 +292,15 @@ def get_weights_path(model_name: str) -> Dict[str, str]:
     :param model_name: The name of the model.
     :return: A dictionary containing the path and filename, or None if not found.
     """
-    modelfile = get_modelfile(model_name)
+    return parse_weights_path(get_modelfile(model_name))
+
+def parse_weights_path(modelfile: str) -> List[Path]:
+    """
+    Parses the paths of the weights from the `FROM` lines of a modelfile.
+
+    :param modelfile: The modelfile contents.
+    :return: A list of paths.
+    """
     match = re.findall(r'^\s*FROM (.+)', modelfile, re.IGNORECASE | re.MULTILINE)
     return [Path(filename) for filename in match]
     
@@ -167,7 +320,15 @@ def get_model_template(model_name: str) -> List[str]:
     :param model_name: The name of the model.
     :return: A list of template lines, or None if the command fails.
     """
-    output = run_ollama(['show', model_name, '--template'])
+    return parse_model_template(run_ollama(['show', model_name, '--template']))
+
+def parse_model_template(output: str) -> List[str]:
+    """
+    Parses the output of `ollama show --template` into its non-empty lines.
+
+    :param output: The template.
+    :return: A list of template lines.
+    """
     return [line.strip() for line in output.splitlines() if line.strip()]
 
 def get_model_params(model_name: str) -> Dict[str, str]:
@@ -177,7 +338,15 @@ def get_model_params(model_name: str) -> Dict[str, str]:
     :param model_name: The name of the model.
     :return: A dictionary of model parameters, or None if the command fails.
     """
-    output = run_ollama(['show', model_name, '--parameters'])
+    return parse_model_params(run_ollama(['show', model_name, '--parameters']))
+
+def parse_model_params(output: str) -> Dict[str, str]:
+    """
+    Parses the output of `ollama show --parameters` into a dictionary.
+
+    :param output: The parameters, one `<key> <value>` pair per line.
+    :return: A dictionary of model parameters.
+    """
     lines = output.splitlines()
     params = {}
 
@@ -0,0 +1,190 @@
+import os
+import sys
+import mmap
+import ctypes
+import ctypes.util
+import subprocess
+from time import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+PREWARM_METHODS = ['read', 'fadvise']
+
+_LOW_BIT = bytes(i & 1 for i in range(256))
+
+_libc = None
+
+def _get_libc():
+    """
+    Load the C library for `mmap` and `mincore`, or None if unavailable.
+    """
+    global _libc
+    if _libc is None:
+        try:
+            _libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            _libc.mmap.restype = ctypes.c_void_p
+            _libc.mmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int,
+                                   ctypes.c_int, ctypes.c_int, ctypes.c_long]
+            _libc.munmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+            _libc.mincore.argtypes = [ctypes.c_void_p, ctypes.c_size_t,
+                                      ctypes.POINTER(ctypes.c_ubyte)]
+        except (OSError, AttributeError, TypeError):
+            _libc = False
+    return _libc or None
+
+def resident_fraction(path: str) -> Optional[float]:
+    """
+    Get the fraction of a file that is resident in the page cache, using
+    `mincore` on a mapping of the file.
+
+    :param path: The path to the file.
+    :return: The fraction in [0, 1], or None if it cannot be determined,
+             e.g., on platforms without `mincore`.
+    """
+    libc = _get_libc()
+    if libc is None:
+        return None
+
+    size = os.path.getsize(path)
+    if size == 0:
+        return 1.0
+
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        addr = libc.mmap(None, size, mmap.PROT_READ, mmap.MAP_SHARED, fd, 0)
+        if addr in (None, ctypes.c_void_p(-1).value):
+            return None
+        try:
+            pages = (size + mmap.PAGESIZE - 1) // mmap.PAGESIZE
+            vec = (ctypes.c_ubyte * pages)()
+            if libc.mincore(addr, size, vec) != 0:
+                return None
+            # The least significant bit of each byte is set if the page is resident
+            return bytes(vec).translate(_LOW_BIT).count(1) / pages
+        finally:
+            libc.munmap(addr, size)
+    finally:
+        os.close(fd)
+
+def _read_range(path: str, offset: int, length: int, chunk_size: int) -> int:
+    """
+    Read a range of a file sequentially, discarding the data.
+
+    :return: The number of bytes read.
+    """
+    buf = bytearray(chunk_size)
+    total = 0
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        while total < length:
+            view = memoryview(buf)[:min(chunk_size, length - total)]
+            if hasattr(os, 'preadv'):
+                n = os.preadv(fd, [view], offset + total)
+            else:
+                n = len(os.pread(fd, len(view), offset + total))
+            if n == 0:
+                break
+            total += n
+    finally:
+        os.close(fd)
+    return total
+
+def prewarm(paths: List[str],
+            method: str = 'read',
+            workers: int = 4,
+            chunk_size: int = 8 * 2**20,
+            segment_size: int = 256 * 2**20) -> Dict[str, Any]:
+    """
+    Pull files into the page cache, so that a later reader, e.g., an
+    inference engine loading the weights, does not wait on cold disk reads.
+
+    The methods are:
+
+        - `read`: Read the files with large sequential reads. Each file is
+          split into segments of `segment_size` bytes, and `workers` threads
+          read the segments in parallel. Returns once the files are cached.
+        - `fadvise`: Ask the kernel to read the files ahead with
+          `posix_fadvise(POSIX_FADV_WILLNEED)`. Returns immediately, while
+          the kernel reads in the background.
+
+    :param paths: The paths to the files.
+    :param method: The method, one of `PREWARM_METHODS`.
+    :param workers: The number of parallel readers for the `read` method.
+    :param chunk_size: The size in bytes of each read.
+    :param segment_size: The size in bytes of the segments read in parallel.
+    :return: A report with, for each file and in total, its size, the
+             fraction that was already resident, and the time taken and
+             throughput of the prewarm. The throughput is None for the
+             `fadvise` method, which does not wait for the reads.
+    """
+    if method not in PREWARM_METHODS:
+        raise ValueError(f"Unknown prewarm method: {method}")
+    if method == 'fadvise' and not hasattr(os, 'posix_fadvise'):
+        raise RuntimeError("posix_fadvise is not available on this platform.")
+
+    files = []
+    for path in paths:
+        size = os.path.getsize(path)
+        files.append({
+            'file_path': path,
+            'file_size': size,
+            'resident_before': resident_fraction(path),
+        })
+
+    start = time()
+    if method == 'fadvise':
+        for f in files:
+            fd = os.open(f['file_path'], os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+    else:
+        segments = [(f['file_path'], offset, min(segment_size, f['file_size'] - offset))
+                    for f in files
+                    for offset in range(0, f['file_size'], segment_size)]
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            list(executor.map(lambda s: _read_range(*s, chunk_size), segments))
+    seconds = time() - start
+
+    total = sum(f['file_size'] for f in files)
+    fractions = [f['resident_before'] for f in files]
+    resident = None
+    if total and None not in fractions:
+        resident = sum(f['file_size'] * f['resident_before'] for f in files) / total
+    return {
+        'method': method,
+        'files': files,
+        'bytes': total,
+        'resident_before': resident,
+        'seconds': seconds,
+        # `fadvise` returns before the kernel reads anything
+        'throughput_mb_s': (total / 2**20 / seconds
+                            if method == 'read' and seconds > 0 else None),
+    }
+
+def prewarm_in_background(paths: List[str],
+                          method: str = 'read',
+                          workers: int = 4,
+                          log_path: Optional[str] = None) -> subprocess.Popen:
+    """
+    Prewarm files in a separate process, e.g., while an engine starts.
+    Unlike a thread, the process outlives this one, so it keeps going even if
+    this process is replaced by the engine with `exec`.
+
+    :param paths: The paths to the files.
+    :param method: The method, one of `PREWARM_METHODS`.
+    :param workers: The number of parallel readers for the `read` method.
+    :param log_path: The file to write the JSON report to, or None to
+                     discard it.
+    :return: The prewarm process.
+    """
+    args = [sys.executable, '-m', 'ollama_data_tools.ollama_data_prewarm',
+            '--method', method, '--workers', str(workers), '--paths', *paths]
+    out = open(log_path, 'w') if log_path else subprocess.DEVNULL
+    try:
+        return subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=out,
+                                stderr=out, start_new_session=True)
+    finally:
+        if log_path:
+            out.close()
@@ -0,0 +1,200 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+from time import time
+from contextlib import closing
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_used_at ON results(used_at);
+"""
+
+def make_key(fingerprint: str,
+             query: str,
+             regex: Optional[str] = None,
+             regex_path: str = '@') -> str:
+    """
+    Get the key of the result of a search on a catalog.
+
+    :param fingerprint: The fingerprint of the content of the catalog.
+    :param query: The JMESPath query.
+    :param regex: The regex pattern, or None.
+    :param regex_path: The JMESPath query for the regex pattern.
+    :return: The key.
+    """
+    return hashlib.sha256(json.dumps([fingerprint, query, regex, regex_path]).encode()).hexdigest()
+
+class QueryCache:
+    """
+    A size-bounded LRU cache of search results, in memory and on disk.
+
+    The results are stored as JSON, so a hit returns a fresh copy that the
+    caller may modify. A hit in memory is the cheapest. A miss in memory
+    falls back to an SQLite database on disk, which outlives the process,
+    e.g., between runs of a CLI, and is shared by the processes that use the
+    same path. Each layer evicts its least recently used results when the
+    total size of its results exceeds its bound.
+
+    The keys include the fingerprint of the catalog (see `make_key`), so the
+    results of an older catalog never hit. `invalidate` also drops them.
+
+    Example usage:
+
+        cache = QueryCache('~/.ollama_data/cache.queries.sqlite')
+        key = make_key(fingerprint, '[*].name')
+        hit, result = cache.get(key)
+        if not hit:
+            result = ...
+            cache.put(key, fingerprint, result)
+        cache.stats()
+    """
+
+    def __init__(self,
+                 path: Optional[str],
+                 max_bytes: int = 64 * 2**20,
+                 max_memory_bytes: int = 16 * 2**20):
+        """
+        Initialize the QueryCache object.
+
+        :param path: The path to the database file, or None to only cache
+                     in memory.
+        :param max_bytes: The maximum total size in bytes of the results on disk.
+        :param max_memory_bytes: The maximum total size in bytes of the
+                                 results in memory.
+        """
+        self.path = os.path.expanduser(path) if path else None
+        self.max_bytes = max_bytes
+        self.max_memory_bytes = max_memory_bytes
+        self.memory = OrderedDict()
+        self.memory_bytes = 0
+        self.lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        dir_name = os.path.dirname(self.path)
+        if dir_name and not os.path.exists(dir_name):
+            os.makedirs(dir_name, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=60)
+        conn.executescript(SCHEMA)
+        return conn
+
+    def _remember(self, key: str, value: str) -> None:
+        """
+        Put a result in memory, evicting the least recently used ones.
+        Must be called with the lock held.
+        """
+        if key in self.memory:
+            self.memory_bytes -= len(self.memory.pop(key))
+        if len(value) > self.max_memory_bytes:
+            return
+        self.memory[key] = value
+        self.memory_bytes += len(value)
+        while self.memory_bytes > self.max_memory_bytes:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_bytes -= len(evicted)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Get a result.
+
+        :param key: The key of the result. See `make_key`.
+        :return: A tuple `(hit, result)`, where `result` is None on a miss.
+        """
+        with self.lock:
+            value = self.memory.get(key)
+            if value is not None:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                return True, json.loads(value)
+
+        if self.path and os.path.exists(self.path):
+            with closing(self._connect()) as conn, conn:
+                row = conn.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    conn.execute('UPDATE results SET used_at = ? WHERE key = ?', (time(), key))
+            if row is not None:
+                with self.lock:
+                    self._remember(key, row[0])
+                    self.disk_hits += 1
+                return True, json.loads(row[0])
+
+        with self.lock:
+            self.misses += 1
+        return False, None
+
+    def put(self, key: str, fingerprint: str, result: Any) -> None:
+        """
+        Put a result, evicting the least recently used results.
+
+        :param key: The key of the result. See `make_key`.
+        :param fingerprint: The fingerprint of the catalog of the result.
+        :param result: The result, which must be JSON-serializable.
+        """
+        value = json.dumps(result)
+        with self.lock:
+            self._remember(key, value)
+        if not self.path or len(value) > self.max_bytes:
+            return
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)',
+                         (key, fingerprint, value, len(value), time()))
+            total = conn.execute('SELECT coalesce(sum(size), 0) FROM results').fetchone()[0]
+            if total > self.max_bytes:
+                # Drop the least recently used results beyond the bound
+                conn.execute('DELETE FROM results WHERE key IN ('
+                             'SELECT key FROM (SELECT key, sum(size) OVER '
+                             '(ORDER BY used_at DESC, key) AS running FROM results) '
+                             'WHERE running > ?)', (self.max_bytes,))
+
+    def invalidate(self, fingerprint: Optional[str] = None) -> None:
+        """
+        Drop the results of other catalogs than the one with the given
+        fingerprint, or all the results.
+
+        :param fingerprint: The fingerprint of the current catalog, or None.
+        """
+        with self.lock:
+            self.memory.clear()
+            self.memory_bytes = 0
+        if self.path and os.path.exists(self.path):
+            with closing(self._connect()) as conn, conn:
+                conn.execute('DELETE FROM results WHERE fingerprint IS NOT ?', (fingerprint,))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the hit and miss counts of this process and the sizes of the layers.
+
+        :return: A JSON-compatible dictionary.
+        """
+        entries, size = 0, 0
+        if self.path and os.path.exists(self.path):
+            with closing(self._connect()) as conn:
+                entries, size = conn.execute(
+                    'SELECT count(*), coalesce(sum(size), 0) FROM results').fetchone()
+        with self.lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'hits': hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': hits / lookups if lookups else None,
+                'memory_entries': len(self.memory),
+                'memory_bytes': self.memory_bytes,
+                'disk_entries': entries,
+                'disk_bytes': size,
+            }
@@ -26,9 +26,9 @@ def regex_path_matcher(data, regex, path='@', elemwise=True):
     regex pattern.
 
     :param data: The JSON data to match the regex pattern against.
-    :param regex: The regex pattern.
+    :param regex: The regex pattern, or a compiled regex.
     :param path: The JMESPath query that creates the view to apply
-                 the matcher to.
+                 the matcher to, or a compiled JMESPath query.
     :param elemwise: Whether to apply the regex matcher to each element
                      of data as opposed to the entire data object.
 
@@ -38,11 +38,13 @@ def regex_path_matcher(data, regex, path='@', elemwise=True):
 
     validate_json(data)
     regex = re.compile(regex)
+    if isinstance(path, str):
+        path = jmespath.compile(path)
     if elemwise:
         if isinstance(data, list):
-            return [m for m in data if regex.search(str(jmespath.search(path, m)))]
+            return [m for m in data if regex.search(str(path.search(m)))]
         elif isinstance(data, dict):
-            return {k: v for k, v in data.items() if regex.search(str(jmespath.search(path, {k: v})))}
+            return {k: v for k, v in data.items() if regex.search(str(path.search({k: v})))}
 
-    return data if regex.search(str(jmespath.search(path, data))) else None
+    return data if regex.search(str(path.search(data))) else None
     
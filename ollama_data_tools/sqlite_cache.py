@@ -0,0 +1,283 @@
+import os
+import json
+import logging
+import sqlite3
+from time import time
+from contextlib import closing
+from typing import Dict, Any, List, Iterator, Optional, Sequence, Union
+from ollama_data_tools import conversion_tools as ct
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stores (
+    host TEXT,
+    saved_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS models (
+    id INTEGER PRIMARY KEY,
+    host TEXT,
+    name TEXT NOT NULL,
+    last_modified TEXT,
+    total_weights_size REAL,
+    total_weights_size_units TEXT,
+    total_bytes INTEGER,
+    system_message TEXT,
+    modelfile TEXT,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    model_id INTEGER NOT NULL REFERENCES models(id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    hash TEXT,
+    media_type TEXT,
+    file_path TEXT,
+    file_size INTEGER,
+    last_modification TEXT
+);
+CREATE TABLE IF NOT EXISTS params (
+    model_id INTEGER NOT NULL REFERENCES models(id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value TEXT
+);
+CREATE INDEX IF NOT EXISTS models_host_name ON models(host, name);
+CREATE INDEX IF NOT EXISTS models_name ON models(name);
+CREATE INDEX IF NOT EXISTS models_total_bytes ON models(total_bytes);
+CREATE INDEX IF NOT EXISTS models_last_modified ON models(last_modified);
+CREATE INDEX IF NOT EXISTS blobs_model_id ON blobs(model_id);
+CREATE INDEX IF NOT EXISTS blobs_hash ON blobs(hash);
+CREATE INDEX IF NOT EXISTS blobs_file_size ON blobs(file_size);
+CREATE INDEX IF NOT EXISTS params_model_id ON params(model_id);
+CREATE INDEX IF NOT EXISTS params_key_value ON params(key, value);
+"""
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Open a connection to a catalog database, creating its tables if needed.
+    The rows of queries are `sqlite3.Row` objects.
+
+    :param path: The path to the database file.
+    :return: The connection.
+    """
+    dir_name = os.path.dirname(path)
+    if dir_name and not os.path.exists(dir_name):
+        os.makedirs(dir_name, exist_ok=True)
+    # Writers from several threads (one per host) wait for each other
+    conn = sqlite3.connect(path, timeout=60)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA foreign_keys = ON')
+    conn.executescript(SCHEMA)
+    return conn
+
+def is_corrupt(e: Exception) -> bool:
+    """
+    Check if an SQLite error means that the database file is corrupt or is
+    not a database at all, as opposed to, e.g., locked or busy, which are
+    `sqlite3.OperationalError`.
+
+    :param e: The error.
+    :return: True if the database file is corrupt.
+    """
+    return type(e) is sqlite3.DatabaseError
+
+def query(path: str, sql: str, params: Sequence[Any] = ()) -> Iterator[Dict[str, Any]]:
+    """
+    Run a read-only SQL query against a catalog database. The tables are:
+
+        - `models`: One row per model and host, with the indexed columns
+          `host`, `name`, `total_bytes` and `last_modified`, and the full
+          JSON `record` of the model.
+        - `blobs`: One row per weight (`kind = 'weight'`) or layer
+          (`kind = 'layer'`) of a model, with the indexed columns
+          `model_id`, `hash` and `file_size` (in bytes).
+        - `params`: One row per parameter of a model, indexed on
+          `(key, value)`.
+        - `stores`: The time each host was last saved.
+
+    :param path: The path to the database file.
+    :param sql: The SQL query.
+    :param params: The parameters of the query.
+    :return: An iterator over the rows as dictionaries.
+    """
+    with closing(sqlite3.connect(f"file:{path}?mode=ro", uri=True)) as conn:
+        conn.row_factory = sqlite3.Row
+        for row in conn.execute(sql, params):
+            yield dict(row)
+
+class SqliteCache:
+    """
+    A cache of model records in an SQLite database, with the interface of
+    `JsonCache`. Unlike `JsonCache`, which rewrites one JSON document, the
+    records are normalized into the indexed tables described in `query`, so
+    lookups and aggregates run in SQLite without loading the catalog.
+
+    Several caches can share a database, each holding the models of one
+    `host`, e.g., one cache per host of a cluster. Saving a host replaces
+    its rows in a single transaction, so readers see either the old or the
+    new models of the host, never a mix.
+
+    Example usage:
+
+        cache = SqliteCache('~/.ollama_data/cache.sqlite', duration='1 hour')
+        cache.save(models)
+        models = cache.load()
+    """
+
+    def __init__(self,
+                 path: str,
+                 duration: Union[int, str] = '1 week',
+                 host: Optional[str] = None):
+        """
+        Initialize the SqliteCache object.
+
+        :param path: The path to the database file.
+        :param duration: The time duration the cache is valid. It can be a string
+                         like "1 day" or an integer representing the number of seconds.
+        :param host: The host whose models this cache holds, or None.
+        """
+        if not isinstance(duration, str):
+            duration = f"{duration} seconds"
+
+        _, duration = ct.parse_duration(duration)
+        self.duration = duration
+        self.path = os.path.expanduser(path)
+        self.host = host
+
+        if self.duration.total_seconds() <= 0:
+            raise ValueError("Duration must be positive.")
+
+    def _saved_at(self) -> Optional[float]:
+        """
+        Get the time the models of the host were last saved, or None.
+        """
+        if not os.path.exists(self.path):
+            return None
+        with closing(connect(self.path)) as conn:
+            row = conn.execute('SELECT saved_at FROM stores WHERE host IS ?',
+                               (self.host,)).fetchone()
+        return row['saved_at'] if row else None
+
+    def get_time_remaining(self) -> float:
+        """
+        Get the time remaining before the cache expires.
+
+        :return: The time remaining in seconds.
+        """
+        try:
+            saved_at = self._saved_at()
+        except sqlite3.DatabaseError as e:
+            if not is_corrupt(e):
+                raise
+            return 0
+        if saved_at is None:
+            return 0
+        return max(0, self.duration.total_seconds() - (time() - saved_at))
+
+    def is_valid(self) -> bool:
+        """
+        Check if the cache is valid based on the elapsed time since the models
+        were saved.
+
+        :return: True if the cache is valid, False otherwise. A corrupt
+                 database is not valid.
+        """
+        try:
+            saved_at = self._saved_at()
+        except sqlite3.DatabaseError as e:
+            if not is_corrupt(e):
+                raise
+            return False
+        return saved_at is not None and time() - saved_at <= self.duration.total_seconds()
+
+    def clear(self) -> None:
+        """
+        Clear the models of the host. A corrupt database is removed, with the
+        models of all its hosts, and is recreated on the next `save`.
+        """
+        if not os.path.exists(self.path):
+            return
+        try:
+            with closing(connect(self.path)) as conn, conn:
+                conn.execute('DELETE FROM models WHERE host IS ?', (self.host,))
+                conn.execute('DELETE FROM stores WHERE host IS ?', (self.host,))
+        except sqlite3.DatabaseError as e:
+            if not is_corrupt(e):
+                raise
+            logger.warning(f"Removing corrupt database {self.path}: {e}")
+            os.remove(self.path)
+
+    def iter_models(self, allow_expired: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over the models of the host without loading them all.
+
+        :param allow_expired: Whether to read the cache even if it has expired.
+        :return: An iterator over the models. See `OllamaData.get_schema`.
+        :raises sqlite3.DatabaseError: If the database is corrupt.
+        """
+        saved_at = self._saved_at()
+        if saved_at is None or not (allow_expired or self.is_valid()):
+            raise RuntimeError("Cache is invalid.")
+
+        with closing(connect(self.path)) as conn:
+            for row in conn.execute('SELECT record FROM models WHERE host IS ? ORDER BY id',
+                                    (self.host,)):
+                yield json.loads(row['record'])
+
+    def load(self, allow_expired: bool = False) -> List[Dict[str, Any]]:
+        """
+        Load the models of the host.
+
+        :param allow_expired: Whether to load the cache even if it has
+                              expired, e.g., as a fallback when the data
+                              cannot be regenerated.
+        :return: The models. See `OllamaData.get_schema`.
+        """
+        return list(self.iter_models(allow_expired))
+
+    def save(self, data: List[Dict[str, Any]]) -> None:
+        """
+        Replace the models of the host in a single transaction. A corrupt
+        database is recreated first. See `clear`.
+
+        :param data: The models. See `OllamaData.get_schema`.
+        """
+        try:
+            self._save(data)
+        except sqlite3.DatabaseError as e:
+            if not is_corrupt(e):
+                raise
+            self.clear()
+            self._save(data)
+
+    def _save(self, data: List[Dict[str, Any]]) -> None:
+        with closing(connect(self.path)) as conn, conn:
+            conn.execute('DELETE FROM models WHERE host IS ?', (self.host,))
+            conn.execute('DELETE FROM stores WHERE host IS ?', (self.host,))
+            conn.execute('INSERT INTO stores (host, saved_at) VALUES (?, ?)',
+                         (self.host, time()))
+            blobs, params = [], []
+            for model in data:
+                size = model.get('total_weights_size') or 0
+                units = model.get('total_weights_size_units', 'GB')
+                model_id = conn.execute(
+                    'INSERT INTO models (host, name, last_modified, total_weights_size, '
+                    'total_weights_size_units, total_bytes, system_message, modelfile, record) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (self.host, model['name'], model.get('last_modified'), size, units,
+                     int(ct.convert_bytes(size, units, 'B')), model.get('system_message'),
+                     model.get('modelfile'), json.dumps(model))).lastrowid
+                for weight in model.get('weights') or []:
+                    file_size = weight.get('file_size')
+                    if file_size is not None:
+                        file_size = int(ct.convert_bytes(
+                            file_size, weight.get('file_size_units', 'B'), 'B'))
+                    blobs.append((model_id, 'weight', weight.get('hash'), None,
+                                  weight.get('file_path'), file_size,
+                                  weight.get('last_modification')))
+                for layer in model.get('layers') or []:
+                    blobs.append((model_id, 'layer', layer.get('hash'),
+                                  layer.get('media_type'), None, layer.get('file_size'), None))
+                for key, value in (model.get('model_params') or {}).items():
+                    params.append((model_id, key, value))
+            conn.executemany('INSERT INTO blobs VALUES (?, ?, ?, ?, ?, ?, ?)', blobs)
+            conn.executemany('INSERT INTO params VALUES (?, ?, ?)', params)
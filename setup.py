@@ -31,6 +31,7 @@ setup(
             'ollama_data_export=ollama_data_tools.ollama_data_export:main',
             'ollama_data_adapter=ollama_data_tools.ollama_data_adapter:main',
             'ollama_data_query=ollama_data_tools.ollama_data_query:main',
+            'ollama_data_prewarm=ollama_data_tools.ollama_data_prewarm:main',
             # other scripts...
         ],
     },